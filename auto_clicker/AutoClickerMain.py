@@ -1,18 +1,23 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-from PIL import Image, ImageTk
-import threading, time
-from pynput.mouse import Controller as MouseController, Button
-from pynput.keyboard import Listener
-import sys, os, tempfile, shutil
+from tkinter import ttk, messagebox, filedialog
+import threading
+import queue
+import sys, os, tempfile
+from click_scheduler import ClickScheduler
+from macro import Macro, MacroRecorder, MacroPlayer, PynputOutput, MacroError, MACRO_EXT
+from asset_cache import cached_logo, install_icon, BUNDLED_CACHE
 
-mouse = MouseController()
+# pynput (and PIL, on a cold cache) are imported after the window is up, see finish_startup
+mouse = None
+Button = None
+
+CALL_POLL_MS = 20  # how often Tk work posted from other threads is picked up
 
 def resource_path(relative_path):
     try:
         base_path = sys._MEIPASS
     except Exception:
-        base_path = os.path.abspath(".")
+        base_path = os.path.dirname(os.path.abspath(__file__))
     return os.path.join(base_path, relative_path)
 
 class AutoClicker:
@@ -22,12 +27,26 @@ class AutoClicker:
         self.root.geometry("480x380")
 
         temp_icon_path = os.path.join(tempfile.gettempdir(), "taskbar.ico")
-        shutil.copy(resource_path("assets/images/taskbar.ico"), temp_icon_path)
+        install_icon(resource_path("assets/images/taskbar.ico"), temp_icon_path)
         self.root.iconbitmap(temp_icon_path)
 
         self.is_running = False
         self.click_delay = 1.0
         self.hotkey = "f2"
+        self.stop_event = threading.Event()
+        self.scheduler = None
+        self.timing_window = None
+        self.macro = None
+        self.recorder = None
+        self.player = None
+        self.listener = None
+        self.started = False
+        self.stats_id = None  # pending update_stats timer, at most one
+        # Tk may only be used from the GUI thread. The hotkey, click and replay threads
+        # post their UI work here; it is run from a Tk timer, which also works when the
+        # window is hosted by xi_launcher and Tk is pumped with update() instead of mainloop().
+        self.calls = queue.SimpleQueue()
+        self.drain_id = self.root.after(CALL_POLL_MS, self.drain_calls)
 
         # Speed chooser
         tk.Label(root, text="Speed:").pack()
@@ -51,11 +70,16 @@ class AutoClicker:
         self.start_button = tk.Button(button_frame, text="Start autoclicker", command=self.start_clicking)
         self.start_button.grid(row=0, column=0, padx=5, pady=5)
 
-        # Image in middle
-        img = Image.open(resource_path("assets/images/mouse.jpg"))
-        img = img.rotate(-90, expand=True)
-        img.thumbnail((220, 220))
-        self.logo = ImageTk.PhotoImage(img)
+        # Image in middle (pre-rendered PNG, see asset_cache.py)
+        logo_path = cached_logo(resource_path("assets/images/mouse.jpg"), resource_path(BUNDLED_CACHE))
+        if logo_path:
+            self.logo = tk.PhotoImage(file=logo_path)
+        else:
+            from PIL import Image, ImageTk
+            img = Image.open(resource_path("assets/images/mouse.jpg"))
+            img = img.rotate(-90, expand=True)
+            img.thumbnail((220, 220))
+            self.logo = ImageTk.PhotoImage(img)
         self.logo_label = tk.Label(button_frame, image=self.logo)
         self.logo_label.grid(row=0, column=1, padx=10)
 
@@ -67,53 +91,231 @@ class AutoClicker:
         self.status_label = tk.Label(root, text="OFF")
         self.status_label.pack(pady=5)
 
+        # Achieved rate and timing jitter of the current/last run
+        self.stats_label = tk.Label(root, text="")
+        self.stats_label.pack()
+
         # Menu bar
         menubar = tk.Menu(root)
         root.config(menu=menubar)
+        macro_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Macro", menu=macro_menu)
+        macro_menu.add_command(label="Record (hotkey stops)", command=self.start_recording)
+        macro_menu.add_command(label="Play once", command=lambda: self.play_macro(loops=1))
+        macro_menu.add_command(label="Play looped (hotkey stops)", command=lambda: self.play_macro(loops=0))
+        macro_menu.add_separator()
+        macro_menu.add_command(label="Open...", command=self.open_macro)
+        macro_menu.add_command(label="Save...", command=self.save_macro)
         info_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Info", menu=info_menu)
+        info_menu.add_command(label="Timing", command=self.show_timing)
         info_menu.add_command(label="About", command=self.show_about)
 
+        # Everything else waits until the window has been drawn once
+        self.root.bind("<Map>", self.on_first_map, add="+")
+
+    def on_first_map(self, event):
+        if not self.started:
+            self.root.after_idle(self.finish_startup)
+
+    def finish_startup(self):
+        global mouse, Button
+        if self.started:
+            return
+        self.started = True
+        from pynput.mouse import Controller as MouseController, Button
+        from pynput.keyboard import Listener
+        mouse = MouseController()
+
         # Hotkey listener
-        listener = Listener(on_press=self.on_key_press)
-        listener.daemon = True
-        listener.start()
+        self.listener = Listener(on_press=self.on_key_press)
+        self.listener.daemon = True
+        self.listener.start()
 
-    def click_loop(self):
-        while self.is_running:
-            mouse.click(Button.left)
-            time.sleep(self.click_delay)
+    def post(self, fn):
+        """Run fn on the GUI thread. Safe to call from any thread."""
+        self.calls.put(fn)
+
+    def drain_calls(self):
+        while True:
+            try:
+                fn = self.calls.get_nowait()
+            except queue.Empty:
+                break
+            fn()
+        self.drain_id = self.root.after(CALL_POLL_MS, self.drain_calls)
+
+    def close(self):
+        """Stop everything running outside Tk: clicking, replay, recording and the hotkey listener."""
+        self.is_running = False
+        self.stop_event.set()
+        if self.player is not None:
+            self.player.stop()  # the player releases anything it still holds down
+        if self.recorder is not None:
+            self.recorder.stop()
+            self.recorder = None
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        self.cancel_stats()
+        if self.drain_id is not None:
+            try:
+                self.root.after_cancel(self.drain_id)
+            except tk.TclError:
+                pass
+            self.drain_id = None
+
+    def click_loop(self, scheduler):
+        scheduler.run()
+        self.post(lambda: self.clicking_ended(scheduler))
+
+    def clicking_ended(self, scheduler):
+        # a quick stop/start may already have replaced this run with a new one
+        if self.scheduler is scheduler and self.is_running:
+            self.is_running = False
+            self.status_label.config(text="OFF")
+            self.update_stats()
 
     def start_clicking(self):
         if not self.is_running:
+            self.finish_startup()
             self.is_running = True
             self.click_delay = float(self.speed_var.get())
             self.hotkey = self.key_var.get().lower()
             self.status_label.config(text="ON")
-            threading.Thread(target=self.click_loop, daemon=True).start()
+            self.stop_event = threading.Event()
+            self.scheduler = ClickScheduler(lambda: mouse.click(Button.left), self.click_delay, self.stop_event)
+            threading.Thread(target=self.click_loop, args=(self.scheduler,), daemon=True).start()
+            self.update_stats()
 
     def stop_clicking(self):
         self.is_running = False
+        self.stop_event.set()
         self.status_label.config(text="OFF")
+        self.update_stats()
 
-    def on_key_press(self, key):
+    def update_stats(self):
+        # called directly on start/stop too: drop the timer already pending, or every
+        # quick stop/start would leave another chain running
+        self.cancel_stats()
+        if self.scheduler is not None:
+            self.stats_label.config(text=self.scheduler.stats.summary())
+            if self.timing_window is not None:
+                self.timing_text.config(text=self.scheduler.stats.jitter.render())
+        if self.is_running:
+            self.stats_id = self.root.after(500, self.update_stats)
+
+    def cancel_stats(self):
+        if self.stats_id is not None:
+            try:
+                self.root.after_cancel(self.stats_id)
+            except tk.TclError:
+                pass
+            self.stats_id = None
+
+    def show_timing(self):
+        # Lateness of each click vs its deadline, HDR-style buckets
+        if self.timing_window is not None:
+            self.timing_window.lift()
+            return
+        self.timing_window = tk.Toplevel(self.root)
+        self.timing_window.title("Click timing")
+        self.timing_text = tk.Label(self.timing_window, font=("Courier", 9), justify="left", anchor="w")
+        self.timing_text.pack(padx=10, pady=10)
+        self.timing_window.protocol("WM_DELETE_WINDOW", self.close_timing)
+        if self.scheduler is not None:
+            self.timing_text.config(text=self.scheduler.stats.jitter.render())
+
+    def close_timing(self):
+        self.timing_window.destroy()
+        self.timing_window = None
+
+    def is_hotkey(self, key):
         try:
-            if key.char == self.hotkey:
-                self.toggle()
+            return key.char == self.hotkey
         except AttributeError:
-            if hasattr(key, "name") and key.name == self.hotkey:
-                self.toggle()
+            return hasattr(key, "name") and key.name == self.hotkey
+
+    def on_key_press(self, key):
+        # pynput thread
+        if self.is_hotkey(key):
+            self.post(self.toggle)
 
     def toggle(self):
-        if self.is_running:
+        if self.recorder is not None:
+            self.stop_recording()
+        elif self.player is not None:
+            self.player.stop()
+        elif self.is_running:
             self.stop_clicking()
         else:
             self.start_clicking()
 
+    # ---------------- Macros ----------------
+    def start_recording(self):
+        if self.is_running or self.recorder is not None or self.player is not None:
+            return
+        self.hotkey = self.key_var.get().lower()
+        self.recorder = MacroRecorder(ignore_key=self.is_hotkey)
+        self.recorder.start()
+        self.status_label.config(text="RECORDING")
+
+    def stop_recording(self):
+        self.macro = self.recorder.stop()
+        self.recorder = None
+        self.status_label.config(text=f"Recorded {len(self.macro):,} events ({self.macro.duration_ns / 1e9:.1f}s)")
+
+    def play_macro(self, loops=1):
+        if self.macro is None or not len(self.macro):
+            messagebox.showinfo("Macro", "Record or open a macro first.")
+            return
+        if self.is_running or self.recorder is not None or self.player is not None:
+            return
+        self.hotkey = self.key_var.get().lower()
+        self.player = MacroPlayer(self.macro, PynputOutput(), loops=loops)
+        self.status_label.config(text="PLAYING")
+        threading.Thread(target=self.play_loop, args=(self.player,), daemon=True).start()
+
+    def play_loop(self, player):
+        player.run()
+        self.post(lambda: self.playing_ended(player))
+
+    def playing_ended(self, player):
+        if self.player is player:
+            self.player = None
+            self.status_label.config(text="OFF")
+
+    def open_macro(self):
+        path = filedialog.askopenfilename(filetypes=[("Macros", "*" + MACRO_EXT)])
+        if not path:
+            return
+        try:
+            self.macro = Macro.load(path)
+        except (OSError, MacroError) as e:
+            messagebox.showerror("Macro", str(e))
+            return
+        self.status_label.config(text=f"Loaded {len(self.macro):,} events")
+
+    def save_macro(self):
+        if self.macro is None:
+            messagebox.showinfo("Macro", "Nothing recorded yet.")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=MACRO_EXT, filetypes=[("Macros", "*" + MACRO_EXT)])
+        if path:
+            try:
+                self.macro.save(path)
+            except OSError as e:
+                messagebox.showerror("Macro", str(e))
+
     def show_about(self):
         messagebox.showinfo("About", "Autoclicker - Joar edition\nVersion 1.0")
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = AutoClicker(root)
+
+    def on_close():
+        app.close()
+        root.destroy()
+    root.protocol("WM_DELETE_WINDOW", on_close)
     root.mainloop()
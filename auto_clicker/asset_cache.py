@@ -0,0 +1,109 @@
+"""
+asset_cache.py
+
+Pre-rendered assets for a fast AutoClicker startup.
+
+The logo is mouse.jpg (2.5 MB) rotated and shrunk to 220x220. Decoding and scaling it
+on every launch costs more than the rest of the window, so the result is stored as a
+small PNG that Tk loads by itself, without importing PIL. Cache files are named by
+CACHE_VERSION, the target size and the source file's hash, so editing the image or
+the processing just produces a new entry.
+
+Lookup order: assets/cache inside the app/bundle (built at build time with
+`python asset_cache.py`), then the per-user cache folder (filled on first run).
+"""
+
+import os
+import sys
+import shutil
+import filecmp
+import hashlib
+import tempfile
+
+CACHE_VERSION = 1  # bump when render_logo changes
+LOGO_SIZE = (220, 220)
+BUNDLED_CACHE = os.path.join("assets", "cache")
+
+
+def cache_dir():
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "AutoClicker")
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def logo_name(src_hash):
+    return f"logo-v{CACHE_VERSION}-{LOGO_SIZE[0]}x{LOGO_SIZE[1]}-{src_hash[:16]}.png"
+
+
+def _replace_atomic(write, dest):
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dest), suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def render_logo(src, dest):
+    from PIL import Image  # only needed when the cache is cold
+    img = Image.open(src)
+    img.draft("RGB", (LOGO_SIZE[0] * 2, LOGO_SIZE[1] * 2))  # let the JPEG decoder downscale
+    img = img.rotate(-90, expand=True)
+    img.thumbnail(LOGO_SIZE)
+    _replace_atomic(lambda tmp: img.save(tmp, "PNG"), dest)
+
+
+def cached_logo(src, bundled_dir=None):
+    """Path of the processed logo for src, rendering it into the user cache if needed.
+    Returns None if it can't be rendered or written."""
+    name = logo_name(file_hash(src))
+    for folder in (bundled_dir, cache_dir()):
+        if folder and os.path.isfile(os.path.join(folder, name)):
+            return os.path.join(folder, name)
+    dest = os.path.join(cache_dir(), name)
+    try:
+        render_logo(src, dest)
+    except OSError:
+        return None
+    return dest
+
+
+def install_icon(src, dest):
+    """Copy src to dest unless an identical file is already there."""
+    try:
+        if os.path.getsize(src) == os.path.getsize(dest) and filecmp.cmp(src, dest, shallow=False):
+            return dest
+    except OSError:
+        pass
+    _replace_atomic(lambda tmp: shutil.copyfile(src, tmp), dest)
+    return dest
+
+
+def main():
+    # build time: pre-render into assets/cache so the bundle starts warm
+    here = os.path.dirname(os.path.abspath(__file__))
+    src = os.path.join(here, "assets", "images", "mouse.jpg")
+    out = os.path.join(here, BUNDLED_CACHE)
+    dest = os.path.join(out, logo_name(file_hash(src)))
+    if os.path.isdir(out):
+        for old in os.listdir(out):
+            if old.startswith("logo-") and os.path.join(out, old) != dest:
+                os.remove(os.path.join(out, old))
+    if not os.path.isfile(dest):
+        render_logo(src, dest)
+    print(dest)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+bench_clicker.py
+
+Timing accuracy of the click loop at every speed preset, with a fake mouse.
+
+Compares the old loop (click, then sleep(delay)) with the deadline scheduler in
+click_scheduler.py: achieved clicks/s against nominal, and how late clicks land.
+--click-us simulates the cost of a real mouse.click() call.
+
+Run:
+python bench_clicker.py --seconds 2 --click-us 20
+"""
+
+import sys
+import time
+import argparse
+import threading
+
+from click_scheduler import ClickScheduler, JitterHistogram, fmt_ns
+
+PRESETS = [1, 0.75, 0.5, 0.25, 0.1, 0.05, 0.025, 0.005, 0.0005, 0.0001]
+
+
+class FakeMouse:
+    def __init__(self, cost_ns=0):
+        self.cost_ns = cost_ns
+        self.clicks = 0
+
+    def click(self, button=None):
+        if self.cost_ns:
+            end = time.perf_counter_ns() + self.cost_ns
+            while time.perf_counter_ns() < end:
+                pass
+        self.clicks += 1
+
+
+def old_loop(mouse, delay, seconds):
+    # the original AutoClicker.click_loop, with lateness measured against the ideal schedule
+    jitter = JitterHistogram()
+    interval = int(delay * 1e9)
+    start = time.perf_counter_ns()
+    end = start + int(seconds * 1e9)
+    n = 0
+    last = start
+    while time.perf_counter_ns() < end:
+        last = time.perf_counter_ns()
+        jitter.record(last - (start + n * interval))
+        mouse.click()
+        n += 1
+        time.sleep(delay)
+    return (n - 1) * 1e9 / (last - start) if n > 1 else 0.0, jitter
+
+
+def deadline_loop(mouse, delay, seconds):
+    scheduler = ClickScheduler(mouse.click, delay)
+    timer = threading.Timer(seconds, scheduler.stop)
+    timer.start()
+    stats = scheduler.run()
+    timer.join()
+    return stats.clicks_per_second, stats.jitter
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=2.0, help="run time per preset")
+    parser.add_argument("--click-us", type=float, default=20.0, help="simulated cost of one click")
+    parser.add_argument("--histogram", action="store_true", help="print the jitter histogram for each run")
+    args = parser.parse_args()
+
+    print(f"{'preset':>8} {'nominal/s':>10} | {'old/s':>9} {'err':>7} {'p99 late':>9} | "
+          f"{'new/s':>9} {'err':>7} {'p50 late':>9} {'p99 late':>9}")
+    for delay in PRESETS:
+        seconds = max(args.seconds, 3 * delay)
+        nominal = 1 / delay
+        old_rate, old_jitter = old_loop(FakeMouse(int(args.click_us * 1000)), delay, seconds)
+        new_rate, new_jitter = deadline_loop(FakeMouse(int(args.click_us * 1000)), delay, seconds)
+        print(f"{delay:>8} {nominal:>10,.1f} | {old_rate:>9,.1f} {(old_rate / nominal - 1) * 100:>6.1f}% "
+              f"{fmt_ns(old_jitter.percentile(99)):>9} | {new_rate:>9,.1f} {(new_rate / nominal - 1) * 100:>6.1f}% "
+              f"{fmt_ns(new_jitter.percentile(50)):>9} {fmt_ns(new_jitter.percentile(99)):>9}")
+        if args.histogram:
+            print(new_jitter.render())
+
+    # stop latency: how long after stop() the loop actually exits
+    scheduler = ClickScheduler(FakeMouse().click, 1.0)
+    thread = threading.Thread(target=scheduler.run)
+    thread.start()
+    time.sleep(0.2)
+    start = time.perf_counter_ns()
+    scheduler.stop()
+    thread.join()
+    print(f"stop latency at 1 s preset: {fmt_ns(time.perf_counter_ns() - start)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+bench_macro.py
+
+Macro buffer size and replay accuracy, with fake controllers.
+
+- size: an hour of mouse movement at --rate Hz (smooth curves, timestamps with a bit of
+  OS jitter), in memory and as a .ximacro file, plus save/load/iterate times
+- replay: a short recording of moves, clicks and keys played back against a fake
+  output; reports how late each event lands vs its scheduled time, per batch window
+  (batched events may go out slightly early, which counts as 0)
+
+Run:
+python bench_macro.py --minutes 60 --rate 1000
+"""
+
+import os
+import sys
+import math
+import time
+import random
+import argparse
+import tempfile
+
+from click_scheduler import JitterHistogram, fmt_ns
+from macro import Macro, MacroPlayer, MOVE, PRESS, RELEASE, KEY_DOWN, KEY_UP
+
+
+class FakeOutput:
+    """Records when each event arrives instead of touching the real mouse and keyboard."""
+
+    def __init__(self):
+        self.log = []  # (perf_counter_ns, name)
+
+    def _hit(self, name):
+        self.log.append((time.perf_counter_ns(), name))
+
+    def move(self, x, y):
+        self._hit("move")
+
+    def press(self, button):
+        self._hit("press")
+
+    def release(self, button):
+        self._hit("release")
+
+    def scroll(self, dx, dy):
+        self._hit("scroll")
+
+    def key_down(self, code):
+        self._hit("key_down")
+
+    def key_up(self, code):
+        self._hit("key_up")
+
+
+def synthetic(seconds, rate, rng):
+    """Mouse wandering along smooth curves, with a click and a key press every second."""
+    macro = Macro()
+    period = 1_000_000_000 // rate
+    t = 0
+    for i in range(int(seconds * rate)):
+        t += period + rng.randint(-period // 20, period // 20)
+        phase = i / rate
+        x = int(960 + 700 * math.sin(phase * 0.7) + 80 * math.sin(phase * 5.3))
+        y = int(540 + 400 * math.cos(phase * 0.45) + 60 * math.sin(phase * 3.1))
+        macro.append(t, MOVE, x, y)
+        if i % rate == 0:
+            macro.append(t, PRESS, x, y, 0)
+            macro.append(t, KEY_DOWN, code=ord("a"))
+        elif i % rate == rate // 25:
+            macro.append(t, RELEASE, x, y, 0)
+            macro.append(t, KEY_UP, code=ord("a"))
+    return macro
+
+
+def size_bench(minutes, rate, rng):
+    start = time.perf_counter()
+    macro = synthetic(minutes * 60, rate, rng)
+    built = time.perf_counter() - start
+    macro.seal()
+    print(f"{minutes} min at {rate} Hz: {len(macro):,} events (built in {built:.1f}s)")
+    print(f"  raw records        {len(macro) * 21 / 1e6:8.1f} MB  (21 bytes/event packed)")
+    print(f"  Macro in memory    {macro.nbytes / 1e6:8.2f} MB  ({macro.nbytes / len(macro):.2f} bytes/event)")
+
+    fd, path = tempfile.mkstemp(suffix=".ximacro")
+    os.close(fd)
+    try:
+        start = time.perf_counter()
+        macro.save(path)
+        saved = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = Macro.load(path)
+        count = sum(1 for _ in loaded.events())
+        read = time.perf_counter() - start
+        print(f"  .ximacro file      {os.path.getsize(path) / 1e6:8.2f} MB  "
+              f"(save {saved:.2f}s, load+iterate {read:.2f}s, {count / read / 1e6:.1f} M events/s)")
+        assert count == len(macro)
+    finally:
+        os.remove(path)
+
+
+def replay_bench(seconds, rate, rng):
+    macro = synthetic(seconds, rate, rng)
+    # when each event should land, relative to the start of the replay
+    scheduled = [(t, kind) for t, kind, *_ in macro.events()]
+    print(f"replay: {seconds:g}s, {len(macro):,} events")
+    print(f"{'batch':>8} {'sent':>8} {'p50 late':>9} {'p99 late':>9} {'max late':>9}")
+    for batch_ms in (0, 1, 5):
+        out = FakeOutput()
+        player = MacroPlayer(macro, out, batch_ms=batch_ms)
+        start = time.perf_counter_ns()
+        player.run()
+        if batch_ms:
+            # moves are coalesced, so only match up clicks and keys
+            due = [t for t, kind in scheduled if kind != MOVE]
+            actual = [t for t, name in out.log if name != "move"]
+        else:
+            due = [t for t, _ in scheduled]
+            actual = [t for t, _ in out.log]
+        jitter = JitterHistogram()
+        for d, a in zip(due, actual):
+            jitter.record(a - start - d)
+        print(f"{batch_ms:>6}ms {player.sent:>8,} {fmt_ns(jitter.percentile(50)):>9} "
+              f"{fmt_ns(jitter.percentile(99)):>9} {fmt_ns(jitter.max_ns):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=float, default=60)
+    parser.add_argument("--rate", type=int, default=1000, help="mouse move events per second")
+    parser.add_argument("--replay-seconds", type=float, default=3)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    size_bench(args.minutes, args.rate, rng)
+    replay_bench(args.replay_seconds, args.rate, rng)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
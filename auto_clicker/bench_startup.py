@@ -0,0 +1,107 @@
+"""
+bench_startup.py
+
+Time-to-window for AutoClicker, measured from process launch.
+
+- before: the old startup, with PIL decoding mouse.jpg, shutil.copy of the icon and
+  pynput set up before the window is shown
+- after (cold): asset cache empty, so the logo is rendered once and stored
+- after (warm): logo loaded from the cache, icon copy skipped, pynput after first frame
+
+"window" is when the main window is mapped, "ready" is when the hotkey listener runs.
+Needs a display (and PIL + pynput, as the app itself does).
+
+Run:
+python bench_startup.py --runs 5
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def child(mode):
+    import tkinter as tk
+    import AutoClickerMain as app_module
+    if mode == "before":
+        from PIL import Image, ImageTk  # imported at the top of the old module
+        import pynput.mouse, pynput.keyboard
+        app_module.cached_logo = lambda src, bundled_dir=None: None
+        app_module.install_icon = shutil.copy
+
+    root = tk.Tk()
+    app = app_module.AutoClicker(root)
+    if mode == "before":
+        app.finish_startup()
+
+    def done():
+        app.finish_startup()
+        print("ready", flush=True)
+        root.destroy()
+
+    def mapped(event):
+        if event.widget is root:
+            print("window", flush=True)
+            root.after_idle(done)
+
+    root.bind("<Map>", mapped, add="+")
+    root.mainloop()
+    return 0
+
+
+def launch(mode, env):
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--child", mode], cwd=HERE, env=env,
+                            stdout=subprocess.PIPE, text=True)
+    times = {}
+    for line in proc.stdout:
+        times[line.strip()] = time.perf_counter() - start
+    if proc.wait() != 0 or "ready" not in times:
+        raise SystemExit(f"{mode} startup failed")
+    return times["window"], times["ready"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", choices=["before", "after"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child)
+
+    cache_home = tempfile.mkdtemp()
+    env = dict(os.environ, LOCALAPPDATA=cache_home)
+    bundled = os.path.join(HERE, "assets", "cache")
+    if os.path.isdir(bundled):
+        print(f"note: {bundled} exists, 'after (cold)' will start warm")
+    try:
+        rows = []
+        runs = [launch("before", env) for _ in range(args.runs)]
+        rows.append(("before", runs))
+        cold = []
+        for _ in range(args.runs):
+            shutil.rmtree(os.path.join(cache_home, "AutoClicker"), ignore_errors=True)
+            cold.append(launch("after", env))
+        rows.append(("after (cold)", cold))
+        rows.append(("after (warm)", [launch("after", env) for _ in range(args.runs)]))
+
+        print(f"median of {args.runs} runs")
+        print(f"{'startup':<14} {'window':>9} {'ready':>9}")
+        for label, results in rows:
+            window = statistics.median(r[0] for r in results)
+            ready = statistics.median(r[1] for r in results)
+            print(f"{label:<14} {window * 1000:>7.0f}ms {ready * 1000:>7.0f}ms")
+    finally:
+        shutil.rmtree(cache_home, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
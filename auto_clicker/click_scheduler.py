@@ -0,0 +1,184 @@
+"""
+click_scheduler.py
+
+Deadline-based click timing for the auto clicker.
+
+Clicks are aimed at absolute deadlines on time.perf_counter_ns(), so the cost of a
+click and sleep overshoot don't add up over time. Most of the wait is a coarse
+Event.wait() (which also makes stop instant); the last stretch before each deadline
+is a short spin. The spin window adapts to how much the OS oversleeps.
+
+No pynput or tkinter here, so it can be driven by a fake mouse.
+"""
+
+import threading
+from bisect import bisect_left
+from time import perf_counter_ns, sleep
+
+NS = 1_000_000_000
+MIN_SPIN_NS = 200_000        # always spin at least the last 0.2 ms
+MAX_SPIN_NS = 20_000_000     # never spin more than 20 ms (Windows default timer tick is ~15.6 ms)
+MAX_BACKLOG = 10             # if this many deadlines behind, skip ahead instead of bursting
+
+
+class JitterHistogram:
+    """HDR-style histogram of lateness in ns: log2 ranges split into linear sub-buckets,
+    so relative precision stays ~1/SUB_BUCKETS from 1 us to minutes with a few hundred counters."""
+
+    SUB_BUCKETS = 16
+    MIN_NS = 1000    # everything under 1 us lands in the first bucket
+    RANGES = 40      # 1 us << 40 is ~12 days, anything later goes in the last bucket
+
+    def __init__(self):
+        # a flat list rather than a dict: the GUI thread reads it while the clicker records
+        self.counts = [0] * (1 + self.RANGES * self.SUB_BUCKETS)
+        self.total = 0
+        self.max_ns = 0
+        self.sum_ns = 0
+
+    def _index(self, value):
+        if value < self.MIN_NS:
+            return 0
+        exp = min((value // self.MIN_NS).bit_length() - 1, self.RANGES - 1)
+        base = self.MIN_NS << exp
+        sub = min((value - base) * self.SUB_BUCKETS // base, self.SUB_BUCKETS - 1)
+        return 1 + exp * self.SUB_BUCKETS + sub
+
+    def _upper(self, index):
+        if index == 0:
+            return self.MIN_NS
+        exp, sub = divmod(index - 1, self.SUB_BUCKETS)
+        base = self.MIN_NS << exp
+        return base + (sub + 1) * base // self.SUB_BUCKETS
+
+    def record(self, value):
+        value = max(0, value)
+        self.counts[self._index(value)] += 1
+        self.total += 1
+        self.sum_ns += value
+        if value > self.max_ns:
+            self.max_ns = value
+
+    def percentile(self, p):
+        if not self.total:
+            return 0
+        target = self.total * p / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return min(self._upper(index), self.max_ns)
+        return self.max_ns
+
+    @property
+    def mean_ns(self):
+        return self.sum_ns / self.total if self.total else 0
+
+    def buckets(self):
+        """Coarse view for display: [(upper_ns, count)] on 1-2-5 steps from 1 us up to the max."""
+        edges = [self.MIN_NS]
+        while edges[-1] < self.max_ns:
+            edges.append(int(edges[-1] * (2.5 if len(edges) % 3 == 2 else 2)))
+        counts = [0] * len(edges)
+        for index, count in enumerate(self.counts):
+            if count:
+                counts[min(bisect_left(edges, self._upper(index)), len(edges) - 1)] += count
+        return list(zip(edges, counts))
+
+    def render(self, width=30):
+        """Text bars, one line per bucket, for the timing window and the benchmark."""
+        rows = self.buckets()
+        peak = max((c for _, c in rows), default=0) or 1
+        return "\n".join(f"<= {fmt_ns(upper):>9} {count:>9,} {'#' * round(count * width / peak)}"
+                         for upper, count in rows)
+
+
+class ClickStats:
+    def __init__(self):
+        self.clicks = 0
+        self.skipped = 0
+        self.first_ns = self.last_ns = 0
+        self.jitter = JitterHistogram()
+
+    @property
+    def clicks_per_second(self):
+        # measured between the first and last click, so a short run isn't skewed by the click at t=0
+        span = self.last_ns - self.first_ns
+        return (self.clicks - 1) * NS / span if self.clicks > 1 and span > 0 else 0.0
+
+    def summary(self):
+        j = self.jitter
+        return (f"{self.clicks_per_second:,.1f} clicks/s | late p50 {fmt_ns(j.percentile(50))}, "
+                f"p99 {fmt_ns(j.percentile(99))}, max {fmt_ns(j.max_ns)}")
+
+
+def fmt_ns(value):
+    if value < 1_000:
+        return f"{value:.0f} ns"
+    if value < 1_000_000:
+        return f"{value / 1_000:.1f} us"
+    if value < NS:
+        return f"{value / 1_000_000:.2f} ms"
+    return f"{value / NS:.2f} s"
+
+
+class DeadlineWaiter:
+    """Waits for absolute perf_counter_ns deadlines: coarse Event.wait, then a short spin."""
+
+    def __init__(self, stop_event=None):
+        self.stop_event = stop_event or threading.Event()
+        self.spin_ns = MIN_SPIN_NS * 5
+
+    def wait_until(self, deadline):
+        """Returns False if stopped while waiting."""
+        stop = self.stop_event
+        remaining = deadline - perf_counter_ns()
+        if remaining > self.spin_ns:
+            target = deadline - self.spin_ns
+            if stop.wait((remaining - self.spin_ns) / NS):
+                return False
+            # learn how far past its target the coarse sleep woke us
+            overshoot = perf_counter_ns() - target
+            self.spin_ns = min(MAX_SPIN_NS, max(MIN_SPIN_NS, (self.spin_ns * 7 + overshoot * 2) // 8))
+        while perf_counter_ns() < deadline:
+            if stop.is_set():
+                return False
+            sleep(0)  # let the GUI thread have the GIL while we spin
+        return not stop.is_set()
+
+
+class ClickScheduler:
+    """Calls click() every interval seconds until stop_event is set."""
+
+    def __init__(self, click, interval, stop_event=None):
+        self.click = click
+        self.interval_ns = max(1, int(interval * NS))
+        self.waiter = DeadlineWaiter(stop_event)
+        self.stop_event = self.waiter.stop_event
+        self.stats = ClickStats()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def run(self):
+        stats = self.stats = ClickStats()
+        interval = self.interval_ns
+        deadline = perf_counter_ns()
+        while not self.stop_event.is_set():
+            if not self.waiter.wait_until(deadline):
+                break
+            now = perf_counter_ns()
+            stats.jitter.record(now - deadline)
+            self.click()
+            if not stats.clicks:
+                stats.first_ns = now
+            stats.last_ns = now
+            stats.clicks += 1
+            deadline += interval
+            behind = perf_counter_ns() - deadline
+            if behind > MAX_BACKLOG * interval:
+                # can't keep this rate (click itself too slow): don't burst to catch up
+                missed = behind // interval
+                stats.skipped += missed
+                deadline += missed * interval
+        return stats
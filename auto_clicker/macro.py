@@ -0,0 +1,387 @@
+"""
+macro.py
+
+Record and replay mouse/keyboard macros for the auto clicker.
+
+Events are (timestamp_ns, type, x, y, code) records kept in column arrays rather than
+one object per event. Every CHUNK_EVENTS events the columns are sealed: delta-encoded,
+byte-shuffled and zlib-compressed (timestamps at 1 us), so a long recording of mouse
+movement stays at a few bytes per event in memory and on disk.
+
+- MOVE x, y = position
+- PRESS / RELEASE x, y = position, code = mouse button (index into BUTTONS)
+- SCROLL x, y = scroll dx, dy
+- KEY_DOWN / KEY_UP code = key (see key_code)
+
+File format (.ximacro): MAGIC, then per chunk a "<II" header (event count, compressed
+size) followed by the compressed chunk.
+
+Replay uses the same deadline waiting as the click scheduler. Output goes through a
+small interface (move, press, release, scroll, key_down, key_up) so it can be driven
+by fake controllers; PynputOutput is the real one.
+"""
+
+import zlib
+import struct
+import threading
+from array import array
+from operator import sub
+from itertools import accumulate, chain
+from time import perf_counter_ns
+
+from click_scheduler import DeadlineWaiter, NS
+
+MOVE, PRESS, RELEASE, SCROLL, KEY_DOWN, KEY_UP = range(6)
+MACRO_EXT = ".ximacro"
+MAGIC = b"XIMACRO\x01"
+CHUNK_HEADER = struct.Struct("<II")
+CHUNK_EVENTS = 65536
+
+# column typecodes, in file order: timestamp, type, x, y, code
+COLUMNS = ("q", "B", "i", "i", "i")
+DELTA = (True, False, True, True, False)
+TIME_UNIT_NS = 1000  # sealed timestamps are kept at 1 us, well below replay jitter
+
+BUTTONS = ["left", "right", "middle", "x1", "x2", "unknown"]
+SPECIAL_KEYS = [
+    "alt", "alt_l", "alt_r", "alt_gr", "backspace", "caps_lock", "cmd", "cmd_l", "cmd_r", "ctrl", "ctrl_l",
+    "ctrl_r", "delete", "down", "end", "enter", "esc", "f1", "f2", "f3", "f4", "f5", "f6", "f7", "f8", "f9",
+    "f10", "f11", "f12", "f13", "f14", "f15", "f16", "f17", "f18", "f19", "f20", "home", "left", "page_down",
+    "page_up", "right", "shift", "shift_l", "shift_r", "space", "tab", "up", "media_play_pause",
+    "media_volume_mute", "media_volume_down", "media_volume_up", "media_previous", "media_next", "insert",
+    "menu", "num_lock", "pause", "print_screen", "scroll_lock",
+]
+VK_BASE = 0x110000  # above the last unicode code point
+
+
+class MacroError(Exception):
+    pass
+
+
+def key_code(key):
+    """pynput Key/KeyCode -> int: char keys are their code point, special keys are negative,
+    keys with only a virtual-key code are VK_BASE + vk."""
+    name = getattr(key, "name", None)
+    if name in SPECIAL_KEYS:
+        return -1 - SPECIAL_KEYS.index(name)
+    if name is not None:
+        key = key.value  # a platform-specific Key: fall back to its KeyCode
+    char = getattr(key, "char", None)
+    if char:
+        return ord(char)
+    vk = getattr(key, "vk", None)
+    return VK_BASE + (vk or 0)
+
+
+def key_from_code(code):
+    """Inverse of key_code: ("special", name), ("char", ch) or ("vk", vk)."""
+    if code < 0:
+        return "special", SPECIAL_KEYS[-1 - code]
+    if code >= VK_BASE:
+        return "vk", code - VK_BASE
+    return "char", chr(code)
+
+
+def _encode(columns):
+    parts = []
+    for index, (typecode, delta, column) in enumerate(zip(COLUMNS, DELTA, columns)):
+        if index == 0:
+            column = [t // TIME_UNIT_NS for t in column]
+        if delta:
+            column = array(typecode, map(sub, column, chain((0,), column)))
+        raw = column.tobytes()
+        size = column.itemsize
+        # byte planes: small deltas leave the high planes all zero, which zlib squeezes to nothing
+        parts.append(b"".join(raw[i::size] for i in range(size)))
+    return zlib.compress(b"".join(parts), 6)
+
+
+def _decode(blob, count):
+    data = zlib.decompress(blob)
+    columns = []
+    offset = 0
+    for index, (typecode, delta) in enumerate(zip(COLUMNS, DELTA)):
+        column = array(typecode)
+        size = column.itemsize
+        planes = data[offset:offset + count * size]
+        offset += count * size
+        raw = bytearray(count * size)
+        for i in range(size):
+            raw[i::size] = planes[i * count:(i + 1) * count]
+        column.frombytes(raw)
+        if delta:
+            column = array(typecode, accumulate(column))
+        if index == 0:
+            column = array(typecode, [t * TIME_UNIT_NS for t in column])
+        columns.append(column)
+    return columns
+
+
+class Macro:
+    """Append-only event buffer with compressed sealed chunks."""
+
+    def __init__(self):
+        self.chunks = []  # [(count, compressed bytes)]
+        self.sealed_count = 0
+        self._reset_open()
+
+    def _reset_open(self):
+        self.t, self.type, self.x, self.y, self.code = (array(tc) for tc in COLUMNS)
+
+    def __len__(self):
+        return self.sealed_count + len(self.t)
+
+    def append(self, timestamp_ns, kind, x=0, y=0, code=0):
+        self.t.append(timestamp_ns)
+        self.type.append(kind)
+        self.x.append(x)
+        self.y.append(y)
+        self.code.append(code)
+        if len(self.t) >= CHUNK_EVENTS:
+            self.seal()
+
+    def seal(self):
+        if not self.t:
+            return
+        count = len(self.t)
+        self.chunks.append((count, _encode((self.t, self.type, self.x, self.y, self.code))))
+        self.sealed_count += count
+        self._reset_open()
+
+    @property
+    def duration_ns(self):
+        if self.t:
+            return self.t[-1]
+        if self.chunks:
+            return _decode(self.chunks[-1][1], self.chunks[-1][0])[0][-1]
+        return 0
+
+    @property
+    def nbytes(self):
+        """Memory held by the events (compressed chunks + open columns)."""
+        return sum(len(blob) for _, blob in self.chunks) + len(self.t) * sum(array(tc).itemsize for tc in COLUMNS)
+
+    def events(self):
+        """Yield (timestamp_ns, type, x, y, code), decompressing one chunk at a time."""
+        for count, blob in self.chunks:
+            yield from zip(*_decode(blob, count))
+        yield from zip(self.t, self.type, self.x, self.y, self.code)
+
+    # ---------------- Files ----------------
+    def save(self, path):
+        self.seal()
+        with open(path, "wb") as f:
+            f.write(MAGIC)
+            for count, blob in self.chunks:
+                f.write(CHUNK_HEADER.pack(count, len(blob)))
+                f.write(blob)
+
+    @classmethod
+    def load(cls, path):
+        macro = cls()
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise MacroError(f"{path} is not a macro file")
+            while True:
+                header = f.read(CHUNK_HEADER.size)
+                if not header:
+                    break
+                if len(header) != CHUNK_HEADER.size:
+                    raise MacroError(f"{path} is truncated")
+                count, size = CHUNK_HEADER.unpack(header)
+                blob = f.read(size)
+                if len(blob) != size:
+                    raise MacroError(f"{path} is truncated")
+                macro.chunks.append((count, blob))
+                macro.sealed_count += count
+        return macro
+
+
+class MacroRecorder:
+    """Fills a Macro from pynput mouse and keyboard listeners.
+
+    The on_* methods match the pynput listener callbacks and can be called directly.
+    ignore_key(key) -> True keeps a key (e.g. the stop hotkey) out of the recording.
+    """
+
+    def __init__(self, record_moves=True, ignore_key=None):
+        self.macro = Macro()
+        self.record_moves = record_moves
+        self.ignore_key = ignore_key
+        self.start_ns = perf_counter_ns()
+        self.listeners = []
+        self.lock = threading.Lock()  # mouse and keyboard listeners run on separate threads
+
+    def _add(self, kind, x=0, y=0, code=0):
+        with self.lock:
+            self.macro.append(perf_counter_ns() - self.start_ns, kind, int(x), int(y), code)
+
+    def on_move(self, x, y):
+        if self.record_moves:
+            self._add(MOVE, x, y)
+
+    def on_click(self, x, y, button, pressed):
+        name = getattr(button, "name", None)
+        code = BUTTONS.index(name) if name in BUTTONS else BUTTONS.index("unknown")
+        self._add(PRESS if pressed else RELEASE, x, y, code)
+
+    def on_scroll(self, x, y, dx, dy):
+        self._add(SCROLL, dx, dy)
+
+    def on_press(self, key):
+        if not (self.ignore_key and self.ignore_key(key)):
+            self._add(KEY_DOWN, code=key_code(key))
+
+    def on_release(self, key):
+        if not (self.ignore_key and self.ignore_key(key)):
+            self._add(KEY_UP, code=key_code(key))
+
+    def start(self):
+        # imported here so recording/replay logic works without a display (benchmarks, fakes)
+        from pynput import mouse, keyboard
+        self.start_ns = perf_counter_ns()
+        self.listeners = [
+            mouse.Listener(on_move=self.on_move, on_click=self.on_click, on_scroll=self.on_scroll),
+            keyboard.Listener(on_press=self.on_press, on_release=self.on_release),
+        ]
+        for listener in self.listeners:
+            listener.daemon = True
+            listener.start()
+
+    def stop(self):
+        for listener in self.listeners:
+            listener.stop()
+        self.listeners = []
+        with self.lock:
+            self.macro.seal()
+        return self.macro
+
+
+class PynputOutput:
+    """Sends replayed events to the real mouse and keyboard."""
+
+    def __init__(self):
+        from pynput.mouse import Controller as MouseController, Button
+        from pynput.keyboard import Controller as KeyboardController, Key, KeyCode
+        self.mouse = MouseController()
+        self.keyboard = KeyboardController()
+        self.Button, self.Key, self.KeyCode = Button, Key, KeyCode
+
+    def _key(self, code):
+        kind, value = key_from_code(code)
+        if kind == "special":
+            return getattr(self.Key, value)
+        if kind == "vk":
+            return self.KeyCode.from_vk(value)
+        return value
+
+    def move(self, x, y):
+        self.mouse.position = (x, y)
+
+    def press(self, button):
+        self.mouse.press(getattr(self.Button, BUTTONS[button]))
+
+    def release(self, button):
+        self.mouse.release(getattr(self.Button, BUTTONS[button]))
+
+    def scroll(self, dx, dy):
+        self.mouse.scroll(dx, dy)
+
+    def key_down(self, code):
+        self.keyboard.press(self._key(code))
+
+    def key_up(self, code):
+        self.keyboard.release(self._key(code))
+
+
+class MacroPlayer:
+    """Replays a Macro on its recorded timeline.
+
+    speed: 2.0 plays twice as fast. loops: number of passes, 0 = until stopped.
+    batch_ms: events due within this window are sent in one go; only the last of a run
+    of moves is sent, which keeps very dense move recordings from flooding the OS.
+    """
+
+    def __init__(self, macro, output, speed=1.0, loops=1, gap=0.0, batch_ms=0.0, stop_event=None):
+        self.macro = macro
+        self.output = output
+        self.speed = speed
+        self.loops = loops
+        self.gap_ns = int(gap * NS)
+        self.batch_ns = int(batch_ms * 1_000_000)
+        self.waiter = DeadlineWaiter(stop_event)
+        self.stop_event = self.waiter.stop_event
+        self.sent = 0
+        self.held = {}  # (RELEASE, button) / (KEY_UP, key) still owed to the OS, in press order
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _send(self, kind, x, y, code):
+        out = self.output
+        if kind == MOVE:
+            out.move(x, y)
+        elif kind == PRESS:
+            out.press(code)
+            self.held[RELEASE, code] = None
+        elif kind == RELEASE:
+            out.release(code)
+            self.held.pop((RELEASE, code), None)
+        elif kind == SCROLL:
+            out.scroll(x, y)
+        elif kind == KEY_DOWN:
+            out.key_down(code)
+            self.held[KEY_UP, code] = None
+        elif kind == KEY_UP:
+            out.key_up(code)
+            self.held.pop((KEY_UP, code), None)
+        self.sent += 1
+
+    def _release_held(self):
+        # stopping mid-replay must not leave a button or key down at OS level
+        while self.held:
+            kind, code = self.held.popitem()[0]
+            try:
+                if kind == RELEASE:
+                    self.output.release(code)
+                else:
+                    self.output.key_up(code)
+            except Exception:
+                pass
+
+    def run(self):
+        """Returns True if every pass completed, False if stopped. Buttons and keys
+        the replay left pressed are released when it returns."""
+        try:
+            return self._run()
+        finally:
+            self._release_held()
+
+    def _run(self):
+        length = int(self.macro.duration_ns / self.speed) + self.gap_ns
+        start = perf_counter_ns()
+        passes = 0
+        while not self.loops or passes < self.loops:
+            base = start + passes * length
+            pending_move = None
+            batch_end = 0
+            for t, kind, x, y, code in self.macro.events():
+                deadline = base + int(t / self.speed)
+                if deadline > batch_end:
+                    if pending_move:
+                        self._send(MOVE, *pending_move, 0)
+                        pending_move = None
+                    if not self.waiter.wait_until(deadline):
+                        return False
+                    batch_end = perf_counter_ns() + self.batch_ns
+                if kind == MOVE and self.batch_ns:
+                    pending_move = (x, y)
+                    continue
+                if pending_move:
+                    self._send(MOVE, *pending_move, 0)
+                    pending_move = None
+                self._send(kind, x, y, code)
+            if pending_move:
+                self._send(MOVE, *pending_move, 0)
+            passes += 1
+        return True
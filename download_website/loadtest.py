@@ -0,0 +1,146 @@
+"""
+loadtest.py
+
+Load test for server.py: requests/s on a small compressed page and MB/s on a large
+download, with many concurrent keep-alive connections on localhost.
+
+By default a server is started in a subprocess on a temporary copy of this folder with
+a synthetic download added; use --url to test a server that is already running.
+Clients are spread over several processes so the client side is not the bottleneck.
+
+Run:
+python loadtest.py --connections 1000 --procs 4
+"""
+
+import os
+import sys
+import time
+import shutil
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from urllib.parse import urlsplit
+from multiprocessing import Pool
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def raise_fd_limit():
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or hard > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard if hard != resource.RLIM_INFINITY else 65536, hard))
+
+
+async def client(host, port, path, deadline, stats):
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        stats["errors"] += 1
+        return
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept-Encoding: gzip, br\r\n\r\n".encode()
+    try:
+        while time.perf_counter() < deadline:
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line[:15].lower() == b"content-length:":
+                    length = int(line[15:])
+            left = length
+            while left:
+                chunk = await reader.read(min(left, 1 << 20))
+                if not chunk:
+                    raise ConnectionError("closed mid-body")
+                left -= len(chunk)
+            stats["requests"] += 1
+            stats["bytes"] += length
+    except (OSError, asyncio.IncompleteReadError, ConnectionError):
+        stats["errors"] += 1
+    finally:
+        writer.close()
+
+
+def run_clients(args):
+    host, port, path, connections, duration = args
+    raise_fd_limit()
+    stats = {"requests": 0, "bytes": 0, "errors": 0}
+
+    async def main():
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(client(host, port, path, deadline, stats) for _ in range(connections)))
+
+    asyncio.run(main())
+    return stats
+
+
+def scenario(name, host, port, path, connections, procs, duration):
+    per_proc = [connections // procs + (1 if i < connections % procs else 0) for i in range(procs)]
+    start = time.perf_counter()
+    with Pool(procs) as pool:
+        results = pool.map(run_clients, [(host, port, path, n, duration) for n in per_proc if n])
+    elapsed = time.perf_counter() - start
+    total = {k: sum(r[k] for r in results) for k in results[0]}
+    print(f"{name:<14} {connections:>6} conns  {total['requests'] / elapsed:>10.0f} req/s  "
+          f"{total['bytes'] / elapsed / 1e6:>9.1f} MB/s  {total['errors']} errors")
+
+
+def start_server(big_mb):
+    root = tempfile.mkdtemp()
+    site = os.path.join(root, "site")
+    shutil.copytree(HERE, site, ignore=shutil.ignore_patterns("__pycache__"))
+    downloads = os.path.join(site, "assets", "downloads")
+    os.makedirs(downloads, exist_ok=True)
+    with open(os.path.join(downloads, "LoadTest.exe"), "wb") as f:
+        for _ in range(big_mb):
+            f.write(os.urandom(1024 * 1024))
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    proc = subprocess.Popen([sys.executable, os.path.join(HERE, "server.py"), "--host", "127.0.0.1",
+                             "--port", str(port), "--root", site], stdout=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.1)
+    return proc, root, f"http://127.0.0.1:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="server to test (default: start one)")
+    parser.add_argument("--connections", type=int, default=1000)
+    parser.add_argument("--procs", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--big-mb", type=int, default=32, help="size of the synthetic download")
+    parser.add_argument("--big-path", default="/assets/downloads/LoadTest.exe")
+    args = parser.parse_args()
+    raise_fd_limit()
+
+    proc = root = None
+    url = args.url
+    if not url:
+        proc, root, url = start_server(args.big_mb)
+    try:
+        parts = urlsplit(url)
+        host, port = parts.hostname, parts.port or 80
+        scenario("index.html", host, port, "/", args.connections, args.procs, args.duration)
+        scenario("catalog", host, port, "/api/catalog.json", args.connections, args.procs, args.duration)
+        scenario("large file", host, port, args.big_path, args.connections, args.procs, args.duration)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+            shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,4 @@
+// Fallback list, used when the page is hosted without server.py (no /api/catalog.json)
 const programs = [
     {
         name: "Total Installer",
@@ -9,19 +10,33 @@ const programs = [
 
 const container = document.getElementById('programs-container');
 
-programs.forEach(program => {
-    const card = document.createElement('div');
-    card.classList.add('program-card');
-    card.dataset.name = program.name.toLowerCase();
+function renderPrograms(list) {
+    container.innerHTML = '';
+    list.forEach(program => {
+        const card = document.createElement('div');
+        card.classList.add('program-card');
+        card.dataset.name = program.name.toLowerCase();
 
-    card.innerHTML = `
-        <img src="${program.icon}" alt="${program.name}">
-        <h3>${program.name}</h3>
-        <p>${program.description}</p>
-        <button onclick="downloadProgram('${program.file}')">Download</button>
-    `;
-    container.appendChild(card);
-});
+        card.innerHTML = `
+            <img src="${program.icon}" alt="${program.name}">
+            <h3>${program.name}</h3>
+            <p>${program.description}</p>
+            <button onclick="downloadProgram('${program.file}')">Download</button>
+        `;
+        container.appendChild(card);
+    });
+}
+
+// Catalog generated by server.py from assets/downloads
+fetch('api/catalog.json')
+    .then(response => response.ok ? response.json() : Promise.reject(response.status))
+    .then(catalog => renderPrograms(catalog.apps.map(app => ({
+        name: app.title,
+        description: app.description,
+        icon: app.icon,
+        file: app.url
+    }))))
+    .catch(() => renderPrograms(programs));
 
 // Search filter
 const searchInput = document.getElementById('search');
@@ -0,0 +1,340 @@
+"""
+server.py
+
+Bundled asyncio web server for the download website.
+
+- Large files are sent with sendfile (zero-copy where the OS supports it)
+- HTTP Range and ETag / If-None-Match, so browsers and XiInstaller can resume and revalidate
+- HTML/CSS/JS are served precompressed (brotli if installed, otherwise gzip)
+- Small assets are kept in memory and refreshed when the file changes
+- /api/catalog.json lists assets/downloads, replacing the hardcoded list in script.js
+- Only the site files (index.html, style.css, script.js) and assets/ are served
+
+Optional metadata for the catalog goes in assets/downloads/meta.json:
+    {"XiExplorer.exe": {"title": "Xi Explorer", "description": "...", "icon": "assets/..."}}
+
+Dependencies:
+- none (brotli is used when installed: pip install brotli)
+
+Run:
+python server.py --port 8080
+"""
+
+import os
+import sys
+import json
+import gzip
+import hashlib
+import asyncio
+import argparse
+import mimetypes
+from email.utils import formatdate
+from urllib.parse import quote, unquote, urlsplit
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DOWNLOADS = os.path.join("assets", "downloads")
+# everything else under the root (server.py, loadtest.py, ...) is not served
+PUBLIC_FILES = {"index.html", "style.css", "script.js"}
+PUBLIC_DIRS = ("assets",)
+CATALOG_URL = "/api/catalog.json"
+COMPRESSIBLE = {".html", ".css", ".js", ".json", ".svg", ".txt"}
+SMALL_FILE = 256 * 1024
+MAX_HEADER = 16 * 1024
+KEEPALIVE_TIMEOUT = 15
+
+REASONS = {200: "OK", 206: "Partial Content", 304: "Not Modified", 400: "Bad Request",
+           404: "Not Found", 405: "Method Not Allowed", 416: "Range Not Satisfiable"}
+
+
+def make_etag(st):
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def parse_range(header, size):
+    """'bytes=a-b' -> (start, end) inclusive, None if absent/ignored, False if unsatisfiable."""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None  # multipart ranges are answered with the whole file
+    first, _, last = header[6:].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            start = max(0, size - int(last))
+            end = size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        return False
+    return start, min(end, size - 1)
+
+
+class CachedFile:
+    """A small response body held in memory together with its compressed variants."""
+
+    def __init__(self, body, etag, compress, mtime_ns=None):
+        self.body = body
+        self.etag = etag
+        self.size = len(body)
+        self.mtime_ns = mtime_ns
+        self.variants = {}
+        if compress:
+            self.variants["gzip"] = gzip.compress(body, 9, mtime=0)
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(body)
+
+    @classmethod
+    def load(cls, path, st):
+        with open(path, "rb") as f:
+            body = f.read()
+        compress = os.path.splitext(path)[1].lower() in COMPRESSIBLE
+        return cls(body, make_etag(st), compress, st.st_mtime_ns)
+
+
+class DownloadServer:
+    def __init__(self, root=ROOT):
+        self.root = os.path.abspath(root)
+        self.downloads = os.path.join(self.root, DOWNLOADS)
+        self.cache = {}
+        self.hashes = {}
+        self.catalog = None  # (downloads folder state, CachedFile)
+        self.stats = {"requests": 0, "bytes": 0}
+
+    # ---------------- Paths ----------------
+    def resolve(self, url_path):
+        """File for url_path, None if it isn't a public file. Raises ValueError on a malformed path."""
+        rel = unquote(url_path, errors="strict").lstrip("/")
+        if "\0" in rel:
+            raise ValueError("NUL in path")
+        path = os.path.normpath(os.path.join(self.root, rel))
+        if os.path.commonpath([self.root, path]) != self.root:
+            return None
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        rel = os.path.relpath(path, self.root)
+        top = rel.split(os.sep, 1)[0]
+        if rel not in PUBLIC_FILES and (top not in PUBLIC_DIRS or top == rel):
+            return None
+        return path if os.path.isfile(path) else None
+
+    def cached(self, path, st):
+        entry = self.cache.get(path)
+        if entry is None or entry.mtime_ns != st.st_mtime_ns or entry.size != st.st_size:
+            entry = CachedFile.load(path, st)
+            self.cache[path] = entry
+        return entry
+
+    # ---------------- Catalog ----------------
+    def sha256(self, path, st):
+        key = (path, st.st_size, st.st_mtime_ns)
+        if key not in self.hashes:
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(chunk)
+            self.hashes[key] = h.hexdigest()
+        return self.hashes[key]
+
+    def build_catalog(self):
+        os.makedirs(self.downloads, exist_ok=True)
+        files = []
+        with os.scandir(self.downloads) as it:
+            for entry in it:
+                if entry.is_file() and entry.name != "meta.json":
+                    files.append((entry.name, entry.stat()))
+        files.sort()
+        meta_path = os.path.join(self.downloads, "meta.json")
+        meta_mtime = os.stat(meta_path).st_mtime_ns if os.path.exists(meta_path) else 0
+        key = (meta_mtime, tuple((n, st.st_size, st.st_mtime_ns) for n, st in files))
+        if self.catalog and self.catalog[0] == key:
+            return self.catalog[1]
+
+        meta = {}
+        if meta_mtime:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        apps = []
+        for name, st in files:
+            info = meta.get(name, {})
+            apps.append({
+                "name": name,
+                "title": info.get("title", os.path.splitext(name)[0]),
+                "description": info.get("description", ""),
+                "icon": info.get("icon", "assets/total_installer.png"),
+                "version": info.get("version"),
+                "url": "/" + DOWNLOADS.replace(os.sep, "/") + "/" + quote(name),
+                "size": st.st_size,
+                "sha256": self.sha256(os.path.join(self.downloads, name), st),
+            })
+        body = json.dumps({"apps": apps}).encode("utf-8")
+        entry = CachedFile(body, '"' + hashlib.sha1(body).hexdigest()[:20] + '"', compress=True)
+        self.catalog = (key, entry)
+        return entry
+
+    # ---------------- HTTP ----------------
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self.send_simple(writer, 400, False)
+                    return
+                keep_alive = await self.respond(head, writer)
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def send_simple(self, writer, status, keep_alive, extra=None, method="GET"):
+        body = f"{status} {REASONS[status]}\n".encode() if status >= 400 else b""
+        headers = {"Content-Length": str(len(body))}
+        if status >= 400:
+            headers["Content-Type"] = "text/plain"
+        headers.update(extra or {})
+        if method == "HEAD":
+            body = b""  # Content-Length still describes the GET response
+        writer.write(self.head(status, headers, keep_alive) + body)
+        await writer.drain()
+        return keep_alive
+
+    def head(self, status, headers, keep_alive):
+        lines = [f"HTTP/1.1 {status} {REASONS[status]}",
+                 "Server: XiDownloads",
+                 "Date: " + formatdate(usegmt=True),
+                 "Connection: " + ("keep-alive" if keep_alive else "close")]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def respond(self, head, writer):
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            return await self.send_simple(writer, 400, False)
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" and (version == "HTTP/1.1" or connection == "keep-alive")
+        self.stats["requests"] += 1
+
+        if method not in ("GET", "HEAD"):
+            return await self.send_simple(writer, 405, keep_alive, {"Allow": "GET, HEAD"})
+        url_path = urlsplit(target).path
+
+        if url_path == CATALOG_URL:
+            # hashing new downloads can take a while, keep it off the event loop
+            entry = await asyncio.get_running_loop().run_in_executor(None, self.build_catalog)
+            return await self.send_cached(writer, entry, "application/json", headers, method, keep_alive,
+                                          cache_control="no-cache")
+        try:
+            path = self.resolve(url_path)
+        except ValueError:
+            # NUL bytes, invalid UTF-8 escapes, a path on another drive (Windows)
+            return await self.send_simple(writer, 400, keep_alive, method=method)
+        if path is None:
+            return await self.send_simple(writer, 404, keep_alive, method=method)
+        st = os.stat(path)
+        ctype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if st.st_size <= SMALL_FILE:
+            return await self.send_cached(writer, self.cached(path, st), ctype, headers, method, keep_alive)
+        return await self.send_file(writer, path, st, ctype, headers, method, keep_alive)
+
+    def not_modified(self, headers, etag):
+        tags = headers.get("if-none-match")
+        return tags is not None and (tags.strip() == "*" or etag in [t.strip() for t in tags.split(",")])
+
+    async def send_cached(self, writer, entry, ctype, headers, method, keep_alive, cache_control="public, max-age=0"):
+        common = {"ETag": entry.etag, "Cache-Control": cache_control, "Accept-Ranges": "bytes"}
+        if entry.variants:
+            common["Vary"] = "Accept-Encoding"
+        if self.not_modified(headers, entry.etag):
+            return await self.send_simple(writer, 304, keep_alive, common, method)
+
+        rng = parse_range(headers.get("range"), entry.size) if headers.get("if-range", entry.etag) == entry.etag else None
+        if rng is False:
+            return await self.send_simple(writer, 416, keep_alive, {"Content-Range": f"bytes */{entry.size}"}, method)
+        status, body = 200, entry.body
+        out = dict(common, **{"Content-Type": ctype})
+        if rng:
+            status = 206
+            body = entry.body[rng[0]:rng[1] + 1]
+            out["Content-Range"] = f"bytes {rng[0]}-{rng[1]}/{entry.size}"
+        else:
+            accept = headers.get("accept-encoding", "")
+            for encoding in ("br", "gzip"):
+                if encoding in entry.variants and encoding in accept:
+                    body = entry.variants[encoding]
+                    out["Content-Encoding"] = encoding
+                    break
+        out["Content-Length"] = str(len(body))
+        writer.write(self.head(status, out, keep_alive))
+        if method == "GET":
+            writer.write(body)
+            self.stats["bytes"] += len(body)
+        await writer.drain()
+        return keep_alive
+
+    async def send_file(self, writer, path, st, ctype, headers, method, keep_alive):
+        etag = make_etag(st)
+        common = {"ETag": etag, "Accept-Ranges": "bytes", "Cache-Control": "public, max-age=0"}
+        if self.not_modified(headers, etag):
+            return await self.send_simple(writer, 304, keep_alive, common, method)
+        rng = parse_range(headers.get("range"), st.st_size) if headers.get("if-range", etag) == etag else None
+        if rng is False:
+            return await self.send_simple(writer, 416, keep_alive, {"Content-Range": f"bytes */{st.st_size}"}, method)
+        start, end = rng or (0, st.st_size - 1)
+        count = end - start + 1
+        out = dict(common, **{"Content-Type": ctype, "Content-Length": str(count)})
+        status = 200
+        if rng:
+            status = 206
+            out["Content-Range"] = f"bytes {start}-{end}/{st.st_size}"
+        writer.write(self.head(status, out, keep_alive))
+        await writer.drain()
+        if method == "GET" and count:
+            with open(path, "rb") as f:
+                # os.sendfile under the hood where available, plain reads otherwise
+                await asyncio.get_running_loop().sendfile(writer.transport, f, start, count)
+            self.stats["bytes"] += count
+        return keep_alive
+
+
+async def serve(host, port, root=ROOT, ready=None):
+    server = DownloadServer(root)
+    srv = await asyncio.start_server(server.handle, host, port, limit=MAX_HEADER, backlog=4096)
+    if ready is not None:
+        ready(srv)
+    async with srv:
+        await srv.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--root", default=ROOT)
+    args = parser.parse_args()
+    print(f"serving {args.root} on http://{args.host}:{args.port}"
+          f" (compression: {'brotli+gzip' if brotli else 'gzip'})")
+    try:
+        asyncio.run(serve(args.host, args.port, args.root))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+bench_breach.py
+
+Build time, lookup latency and resident memory of the breach index (breach.py) on a
+synthetic HIBP-style corpus of random SHA-1 hashes.
+
+Run:
+python bench_breach.py --hashes 5000000 --lookups 200000 --jobs 4
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+from breach import BreachIndex, build_index, check_many, sha1
+
+
+def rss_mb(kind):
+    """RssAnon (private memory) or RssFile (mapped file pages, shared and reclaimable).
+    Linux only."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(kind + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hashes", type=int, default=5_000_000)
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    try:
+        corpus = os.path.join(root, "corpus.txt")
+        known = []
+        with open(corpus, "w") as f:
+            for i in range(args.hashes):
+                digest = os.urandom(20)
+                if i < args.lookups:
+                    known.append(digest)
+                f.write(f"{digest.hex().upper()}:1\n")
+        index_path = os.path.join(root, "breached.idx")
+        start = time.perf_counter()
+        count = build_index(corpus, index_path)
+        print(f"build: {count:,} hashes in {time.perf_counter() - start:.1f}s, "
+              f"index {os.path.getsize(index_path) / 1e6:.0f} MB")
+
+        misses = [sha1(os.urandom(12).hex()) for _ in range(args.lookups)]
+        anon, mapped = rss_mb("RssAnon"), rss_mb("RssFile")
+        with BreachIndex(index_path) as index:
+            for label, digests in (("hit", known), ("miss", misses)):
+                start = time.perf_counter()
+                found = sum(index.contains_hash(d) for d in digests)
+                elapsed = time.perf_counter() - start
+                print(f"{label:<5} {elapsed / len(digests) * 1e6:6.2f} us/lookup  ({found:,} found)")
+            print(f"resident growth after lookups: {rss_mb('RssAnon') - anon:.1f} MB private, "
+                  f"{rss_mb('RssFile') - mapped:.1f} MB of mapped index pages")
+
+        passwords = [os.urandom(9).hex() for _ in range(args.lookups)]
+        for jobs in sorted({1, args.jobs}):
+            start = time.perf_counter()
+            check_many(passwords, index_path, workers=jobs)
+            elapsed = time.perf_counter() - start
+            print(f"check_many, {jobs} process(es): {len(passwords) / elapsed:,.0f} passwords/s")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+bench_passwords.py
+
+Passwords per second: the old per-character random.choice loop vs passwords.py,
+single process and spread over processes (written to a null stream).
+
+Run:
+python bench_passwords.py --count 1000000 --length 16 --jobs 4
+"""
+
+import os
+import sys
+import time
+import random
+import string
+import argparse
+
+import passwords
+from passwords import Policy, draw, write_passwords
+
+
+def old_password(password_length):
+    # the original main.py, minus the prompt
+    characters = string.ascii_letters + string.digits + string.punctuation
+    password = [
+        random.choice(string.ascii_lowercase),
+        random.choice(string.ascii_uppercase),
+        random.choice(string.digits),
+        random.choice(string.punctuation)
+    ]
+    password += [random.choice(characters) for _ in range(password_length - 4)]
+    random.shuffle(password)
+    return "".join(password)
+
+
+class NullStream:
+    def write(self, data):
+        return len(data)
+
+
+def rate(label, count, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {count / elapsed:>14,.0f} passwords/s")
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--length", type=int, default=16)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    policy = Policy(length=args.length)
+    print(f"{args.count:,} passwords of {args.length} chars, all four classes required "
+          f"(numpy: {'yes' if passwords.np is not None else 'no'})")
+
+    old_count = min(args.count, 200_000)
+    base = rate("old random.choice loop", old_count, lambda: [old_password(args.length) for _ in range(old_count)])
+    if passwords.np is not None:
+        np_module = passwords.np
+        rate("engine, numpy", args.count, lambda: draw(policy, args.count))
+        passwords.np = None
+        rate("engine, pure python", args.count, lambda: draw(policy, args.count))
+        passwords.np = np_module
+    else:
+        rate("engine, pure python", args.count, lambda: draw(policy, args.count))
+    single = rate("write, 1 process", args.count, lambda: write_passwords(args.count, policy, NullStream()))
+    multi = rate(f"write, {args.jobs} processes", args.count,
+                 lambda: write_passwords(args.count, policy, NullStream(), workers=args.jobs))
+    print(f"speedup vs old loop: {single / base:.1f}x single process, {multi / base:.1f}x with {args.jobs}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
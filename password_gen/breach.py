@@ -0,0 +1,348 @@
+"""
+breach.py
+
+Offline breached-password check against a local corpus (e.g. a downloaded HIBP
+SHA-1 dump, or a plain list of passwords).
+
+The corpus is converted once into an index file:
+
+    header (64 bytes)  MAGIC, hash count, bloom block count, bits per key
+    bloom filter       blocked: one 64-byte block per key, so a lookup touches one page
+    hashes             sorted, unique, 20-byte SHA-1 digests
+
+The file is memory-mapped, so only pages that lookups touch are read in. A miss in the
+bloom filter answers "not breached" right away; otherwise the sorted table is searched,
+starting from the position the (uniform) hash value predicts.
+
+Run:
+python breach.py build pwned-passwords-sha1-ordered-by-hash.txt -o breached.idx
+python breach.py check -i breached.idx -f passwords.txt -j 4
+"""
+
+import os
+import sys
+import mmap
+import math
+import heapq
+import struct
+import hashlib
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGIC = b"XIBRCH01"
+HEADER = struct.Struct("<8sQQI")
+HEADER_SIZE = 64
+HASH_SIZE = 20
+BLOOM_KEY = struct.Struct("<I8H")  # block from digest bytes 0..3, bit positions from 4..19
+BLOCK_BYTES = 64
+BLOCK_BITS = BLOCK_BYTES * 8
+MAX_K = 8                # bit positions per key, one 16-bit word of the digest each
+RUN_HASHES = 4_000_000   # hashes sorted in memory per run while building
+DEFAULT_FP = 0.001
+
+
+class BreachIndexError(Exception):
+    pass
+
+
+def sha1(password):
+    if isinstance(password, str):
+        password = password.encode("utf-8")
+    return hashlib.sha1(password).digest()
+
+
+def _bloom_bits(digest, nblocks, k):
+    """[(byte offset in the bloom filter, bit mask)] for the key's k bits."""
+    block, *words = BLOOM_KEY.unpack(digest)
+    base = (block % nblocks) * BLOCK_BYTES
+    return [(base + ((w & (BLOCK_BITS - 1)) >> 3), 1 << (w & 7)) for w in words[:k]]
+
+
+def _fill_bloom(bloom, digests, nblocks, k):
+    if np is not None:
+        keys = np.frombuffer(b"".join(digests), np.dtype([("block", "<u4"), ("words", "<u2", 8)]))
+        words = keys["words"][:, :k] & (BLOCK_BITS - 1)
+        offsets = (keys["block"] % nblocks).astype(np.int64)[:, None] * BLOCK_BYTES + (words >> 3)
+        np.bitwise_or.at(np.frombuffer(bloom, np.uint8), offsets.ravel(), (1 << (words & 7)).astype(np.uint8).ravel())
+        return
+    for digest in digests:
+        for offset, bit in _bloom_bits(digest, nblocks, k):
+            bloom[offset] |= bit
+
+
+def bloom_size(count, fp_rate):
+    """(blocks, k) for count keys at roughly fp_rate false positives."""
+    bits = max(BLOCK_BITS, -count * math.log(fp_rate) / math.log(2) ** 2)
+    k = max(1, min(MAX_K, round(bits / max(count, 1) * math.log(2))))
+    return math.ceil(bits / BLOCK_BITS), k
+
+
+# ---------------- Building ----------------
+def _read_corpus(path, fmt):
+    """Yield SHA-1 digests from a HIBP dump (HEX[:count]) or a plain password list."""
+    with open(path, "rb") as f:
+        for line in f:
+            line = line.rstrip(b"\r\n")
+            if not line:
+                continue
+            if fmt == "auto":
+                head = line.split(b":", 1)[0]
+                fmt = "hibp" if len(head) == 40 and all(c in b"0123456789abcdefABCDEF" for c in head) else "plain"
+            if fmt == "hibp":
+                yield bytes.fromhex(line[:40].decode("ascii"))
+            else:
+                yield hashlib.sha1(line).digest()
+
+
+def _write_run(hashes, folder):
+    fd, path = tempfile.mkstemp(dir=folder, suffix=".run")
+    with os.fdopen(fd, "wb") as f:
+        f.write(b"".join(sorted(hashes)))
+    return path
+
+
+def _read_run(path):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(HASH_SIZE * 65536)
+            if not chunk:
+                return
+            yield from (chunk[i:i + HASH_SIZE] for i in range(0, len(chunk), HASH_SIZE))
+
+
+def build_index(corpus, out_path, fmt="auto", fp_rate=DEFAULT_FP, on_progress=None):
+    """Convert corpus into an index at out_path. Returns the number of unique hashes.
+
+    Hashes are sorted in runs of RUN_HASHES and merged (external sort); an input that is
+    already ordered by hash, like HIBP's "ordered by hash" download, merges trivially.
+    """
+    folder = os.path.dirname(os.path.abspath(out_path))
+    runs = []
+    total = 0
+    try:
+        batch = []
+        for digest in _read_corpus(corpus, fmt):
+            batch.append(digest)
+            if len(batch) >= RUN_HASHES:
+                runs.append(_write_run(batch, folder))
+                total += len(batch)
+                batch = []
+                if on_progress:
+                    on_progress("sorting", total)
+        if batch or not runs:
+            runs.append(_write_run(batch, folder))
+            total += len(batch)
+
+        nblocks, k = bloom_size(total, fp_rate)
+        bloom = bytearray(nblocks * BLOCK_BYTES)
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        count = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(bytes(HEADER_SIZE))
+                f.write(bloom)  # placeholder, rewritten once filled
+                previous = None
+                pending = []
+                for digest in heapq.merge(*(_read_run(r) for r in runs)):
+                    if digest == previous:
+                        continue
+                    previous = digest
+                    pending.append(digest)
+                    count += 1
+                    if len(pending) >= 65536:
+                        _fill_bloom(bloom, pending, nblocks, k)
+                        f.write(b"".join(pending))
+                        pending = []
+                        if on_progress:
+                            on_progress("writing", count)
+                _fill_bloom(bloom, pending, nblocks, k)
+                f.write(b"".join(pending))
+                f.seek(0)
+                f.write(HEADER.pack(MAGIC, count, nblocks, k).ljust(HEADER_SIZE, b"\0"))
+                f.write(bloom)
+            os.replace(tmp, out_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    finally:
+        for run in runs:
+            os.remove(run)
+    return count
+
+
+# ---------------- Lookups ----------------
+class BreachIndex:
+    """Memory-mapped index from build_index. Picklable (reopens by path), so it can be
+    handed to worker processes or used as the generator's reject filter."""
+
+    def __init__(self, path):
+        self.path = path
+        self._open()
+
+    def _open(self):
+        with open(self.path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.mm) < HEADER_SIZE:
+            self.mm.close()
+            raise BreachIndexError(f"{self.path} is not a breach index")
+        magic, self.count, self.nblocks, self.k = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            self.mm.close()
+            raise BreachIndexError(f"{self.path} is not a breach index")
+        self.table = HEADER_SIZE + self.nblocks * BLOCK_BYTES
+        if len(self.mm) != self.table + self.count * HASH_SIZE:
+            self.mm.close()
+            raise BreachIndexError(f"{self.path} is truncated")
+        # how far the real position can be from the one predicted by the hash value
+        self.slack = int(4 * math.sqrt(self.count)) + 64
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.path = state["path"]
+        self._open()
+
+    def close(self):
+        self.mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _entry(self, i):
+        start = self.table + i * HASH_SIZE
+        return self.mm[start:start + HASH_SIZE]
+
+    def maybe_contains_hash(self, digest):
+        """Bloom filter only: False means definitely not in the corpus."""
+        mm = self.mm
+        for offset, bit in _bloom_bits(digest, self.nblocks, self.k):
+            if not mm[HEADER_SIZE + offset] & bit:
+                return False
+        return True
+
+    def contains_hash(self, digest):
+        if not self.count or not self.maybe_contains_hash(digest):
+            return False
+        guess = int.from_bytes(digest[:8], "big") * self.count >> 64
+        lo = max(0, guess - self.slack)
+        hi = min(self.count, guess + self.slack)
+        if lo and self._entry(lo) > digest:
+            lo = 0
+        if hi < self.count and self._entry(hi - 1) < digest:
+            hi = self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = self._entry(mid)
+            if entry < digest:
+                lo = mid + 1
+            elif entry > digest:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def contains(self, password):
+        return self.contains_hash(sha1(password))
+
+    __contains__ = contains
+
+    def __len__(self):
+        return self.count
+
+
+# ---------------- Strength ----------------
+def estimate_entropy(password):
+    """Rough strength in bits: log2 of the character pool per character, with repeats and
+    runs like "aaa", "abc" or "321" counted as ~1 bit each. An upper bound for anything
+    human-chosen; a breached password should be treated as 0 regardless."""
+    if not password:
+        return 0.0
+    pool = 0
+    if any(c.islower() for c in password):
+        pool += 26
+    if any(c.isupper() for c in password):
+        pool += 26
+    if any(c.isdigit() for c in password):
+        pool += 10
+    if any(not c.isalnum() and c.isascii() for c in password):
+        pool += 33
+    if any(not c.isascii() for c in password):
+        pool += 100
+    per_char = math.log2(max(pool, 2))
+    bits = per_char
+    for prev, c in zip(password, password[1:]):
+        step = ord(c) - ord(prev)
+        bits += 1.0 if step in (-1, 0, 1) else per_char
+    return bits
+
+
+# ---------------- Bulk checks ----------------
+_worker_index = None
+
+
+def _init_worker(path):
+    global _worker_index
+    _worker_index = BreachIndex(path)
+
+
+def _check_chunk(passwords):
+    return [(_worker_index.contains(pw), estimate_entropy(pw)) for pw in passwords]
+
+
+def check_many(passwords, index_path, workers=1, chunk=10_000):
+    """[(breached, entropy_bits)] for each password, in order."""
+    passwords = list(passwords)
+    chunks = [passwords[i:i + chunk] for i in range(0, len(passwords), chunk)]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(index_path,)) as pool:
+            return [r for part in pool.map(_check_chunk, chunks) for r in part]
+    with BreachIndex(index_path) as index:
+        return [(index.contains(pw), estimate_entropy(pw)) for pw in passwords]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline breached-password index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="convert a corpus into an index")
+    build.add_argument("corpus")
+    build.add_argument("-o", "--output", required=True)
+    build.add_argument("--format", choices=["auto", "hibp", "plain"], default="auto")
+    build.add_argument("--fp", type=float, default=DEFAULT_FP, help="bloom filter false positive rate")
+    check = sub.add_parser("check", help="check passwords against an index")
+    check.add_argument("passwords", nargs="*")
+    check.add_argument("-i", "--index", required=True)
+    check.add_argument("-f", "--file", help="one password per line")
+    check.add_argument("-j", "--jobs", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        count = build_index(args.corpus, args.output, args.format, args.fp,
+                            on_progress=lambda stage, n: print(f"{stage} {n:,}", file=sys.stderr))
+        print(f"{count:,} hashes -> {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB)")
+        return 0
+
+    passwords = list(args.passwords)
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            passwords += [line.rstrip("\r\n") for line in f if line.strip()]
+    breached = 0
+    for pw, (hit, bits) in zip(passwords, check_many(passwords, args.index, args.jobs)):
+        breached += hit
+        print(f"{'BREACHED' if hit else 'ok':<8} {0.0 if hit else bits:6.1f} bits  {pw}")
+    print(f"{breached} of {len(passwords)} breached", file=sys.stderr)
+    return 1 if breached else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,85 @@
-import random, string
+"""
+main.py
 
-password_length = int(input("Write password length: "))
+Password generator.
 
-characters = string.ascii_letters + string.digits + string.punctuation
-password = [
-    random.choice(string.ascii_lowercase),
-    random.choice(string.ascii_uppercase),
-    random.choice(string.digits),
-    random.choice(string.punctuation)
-]
-password += [random.choice(characters) for _ in range(password_length - 4)]
-random.shuffle(password)
+Run without arguments for one password from a length prompt, or generate in bulk:
+python main.py -n 50000 --length 20 --exclude "Il1O0" -o accounts.txt -j 8
+Add --breach-index breached.idx to redraw anything found in a breach corpus (breach.py).
 
-print("Your password:", "".join(password))
+Passwords come from the OS CSPRNG, see passwords.py.
+"""
+
+import sys
+import time
+import argparse
+
+from passwords import Policy, PolicyError, CLASSES, AMBIGUOUS, generate_password, write_passwords
+from breach import BreachIndex, BreachIndexError
+
+
+def interactive():
+    while True:
+        try:
+            length = int(input("Write password length: "))
+        except ValueError:
+            print("Please enter a whole number.")
+            continue
+        try:
+            policy = Policy(length=length)
+            break
+        except PolicyError as e:
+            print(e)
+    print("Your password:", generate_password(policy))
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        return interactive()
+
+    parser = argparse.ArgumentParser(description="Generate passwords in bulk.")
+    parser.add_argument("-n", "--count", type=int, default=1)
+    parser.add_argument("-l", "--length", type=int, default=16)
+    parser.add_argument("--classes", default=",".join(CLASSES),
+                        help=f"comma separated, from: {', '.join(CLASSES)}")
+    parser.add_argument("--require", help="classes that must appear (default: all of --classes, 'none' for none)")
+    parser.add_argument("--exclude", default="", help="characters never to use")
+    parser.add_argument("--no-ambiguous", action="store_true", help=f"also exclude {AMBIGUOUS}")
+    parser.add_argument("--extra", default="", help="extra characters to allow")
+    parser.add_argument("-o", "--output", help="file to write (default: stdout)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="processes to generate with")
+    parser.add_argument("--breach-index", help="index from breach.py; breached passwords are redrawn")
+    args = parser.parse_args(argv)
+
+    classes = [c.strip() for c in args.classes.split(",") if c.strip()]
+    require = None
+    if args.require is not None:
+        require = [] if args.require == "none" else [c.strip() for c in args.require.split(",") if c.strip()]
+    exclude = args.exclude + (AMBIGUOUS if args.no_ambiguous else "")
+    try:
+        policy = Policy(args.length, classes, exclude, require, args.extra)
+    except PolicyError as e:
+        parser.error(str(e))
+    reject = None
+    if args.breach_index:
+        try:
+            reject = BreachIndex(args.breach_index).contains
+        except (OSError, BreachIndexError) as e:
+            parser.error(str(e))
+
+    start = time.perf_counter()
+    if args.output:
+        with open(args.output, "wb") as out:
+            count = write_passwords(args.count, policy, out, args.jobs, reject=reject)
+    else:
+        count = write_passwords(args.count, policy, sys.stdout.buffer, args.jobs, reject=reject)
+        sys.stdout.flush()
+    elapsed = time.perf_counter() - start
+    print(f"{count:,} passwords, {policy.entropy_bits:.1f} bits each, {elapsed:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
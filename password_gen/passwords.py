@@ -0,0 +1,229 @@
+"""
+passwords.py
+
+Bulk password generation from the OS CSPRNG.
+
+Random bytes come from os.urandom in large buffers. Each byte is mapped onto the
+alphabet with rejection sampling (bytes >= 256 - 256 % n are dropped), so every
+character is uniform; with bytes.translate that happens in C for a whole buffer at
+once, or in NumPy when it is installed. Required character classes are guaranteed by
+rejecting whole passwords that miss one, which keeps the result uniform over all
+passwords that satisfy the policy (placing one char per class and shuffling does not).
+
+    from passwords import Policy, generate
+    generate(1000, Policy(length=20, exclude="Il1O0"))
+
+Large counts can be spread over processes with write_passwords(..., workers=N).
+"""
+
+import os
+import re
+import math
+import string
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CLASSES = {
+    "lower": string.ascii_lowercase,
+    "upper": string.ascii_uppercase,
+    "digits": string.digits,
+    "symbols": string.punctuation,
+}
+AMBIGUOUS = "Il1|O0o"
+BUFFER_BYTES = 1 << 20
+MIN_ACCEPT = 1e-4    # refuse policies where fewer than 1 in 10,000 candidates qualify
+BLOCK = 50_000       # passwords per work unit when writing / using processes
+
+
+class PolicyError(ValueError):
+    pass
+
+
+class Policy:
+    """What a password may and must contain.
+
+    classes: names from CLASSES to draw from. extra: more characters to allow.
+    exclude: characters never to use. require: classes that must appear at least once
+    (default: all of classes; pass () for none).
+    """
+
+    def __init__(self, length=16, classes=tuple(CLASSES), exclude="", require=None, extra=""):
+        unknown = [c for c in classes if c not in CLASSES]
+        if unknown:
+            raise PolicyError(f"unknown character class: {', '.join(unknown)} (have {', '.join(CLASSES)})")
+        self.length = int(length)
+        self.classes = tuple(classes)
+        self.exclude = exclude
+        self.require = tuple(classes if require is None else require)
+        self.extra = extra
+
+        excluded = set(exclude)
+        alphabet = []
+        for name in self.classes:
+            alphabet += [ch for ch in CLASSES[name] if ch not in excluded and ch not in alphabet]
+        alphabet += [ch for ch in extra if ch not in excluded and ch not in alphabet]
+        self.alphabet = "".join(alphabet)
+        if len(self.alphabet) < 2:
+            raise PolicyError("the alphabet needs at least 2 characters")
+        if max(map(ord, self.alphabet)) > 0xFF:
+            raise PolicyError("only single-byte (latin-1) characters are supported")
+        if self.length < 1:
+            raise PolicyError("length must be at least 1")
+
+        self.required_sets = []
+        for name in self.require:
+            if name not in self.classes:
+                raise PolicyError(f"required class {name} is not one of the allowed classes")
+            chars = set(CLASSES[name]) - excluded
+            if not chars:
+                raise PolicyError(f"required class {name} is empty after exclusions")
+            self.required_sets.append(chars)
+
+        self.acceptance = self._acceptance()
+        if self.acceptance < MIN_ACCEPT:
+            raise PolicyError(f"length {self.length} is too short to contain all required classes")
+
+        n = len(self.alphabet)
+        self.limit = 256 - 256 % n
+        alpha = self.alphabet.encode("latin-1")
+        self.table = bytes(alpha[b % n] for b in range(256))
+        self.rejected = bytes(range(self.limit, 256))
+        # one lookahead per required class, each confined to the password's own length
+        self.check = None
+        if self.required_sets:
+            self.check = re.compile(b"".join(
+                b"(?=.{0,%d}[%s])" % (self.length - 1, re.escape("".join(sorted(chars)).encode("latin-1")))
+                for chars in self.required_sets), re.S)
+
+    def _acceptance(self):
+        """P(a uniform random string over the alphabet contains every required class).
+
+        Inclusion-exclusion over the (disjoint) required classes.
+        """
+        n = len(self.alphabet)
+        sizes = [len(chars & set(self.alphabet)) for chars in self.required_sets]
+        p = 0.0
+        for k in range(len(sizes) + 1):
+            for subset in combinations(sizes, k):
+                p += (-1) ** k * ((n - sum(subset)) / n) ** self.length
+        return max(p, 0.0)
+
+    @property
+    def entropy_bits(self):
+        """log2 of the number of passwords this policy can produce, all equally likely."""
+        return self.length * math.log2(len(self.alphabet)) + math.log2(self.acceptance)
+
+    def __repr__(self):
+        return (f"Policy(length={self.length}, classes={self.classes}, exclude={self.exclude!r}, "
+                f"require={self.require}, extra={self.extra!r})")
+
+
+def _raw_needed(policy, count):
+    # bytes of randomness for count passwords, with some headroom for rejections
+    per_password = policy.length * 256 / policy.limit / policy.acceptance
+    return int(count * per_password * 1.1) + 64
+
+
+def _draw_python(policy, count):
+    length = policy.length
+    check = policy.check.match if policy.check else None
+    out = []
+    while len(out) < count:
+        want = count - len(out)
+        chars = os.urandom(min(_raw_needed(policy, want), BUFFER_BYTES)).translate(policy.table, policy.rejected)
+        candidates = (chars[i:i + length] for i in range(0, len(chars) - length + 1, length))
+        out += [pw for pw in candidates if check(pw)] if check else candidates
+    return b"".join(out[:count])
+
+
+def _draw_numpy(policy, count):
+    length = policy.length
+    n = len(policy.alphabet)
+    alpha = np.frombuffer(policy.alphabet.encode("latin-1"), np.uint8)
+    if policy.required_sets:
+        bits = np.zeros(n, np.uint32)
+        for i, chars in enumerate(policy.required_sets):
+            bits[[ch in chars for ch in policy.alphabet]] |= 1 << i
+        full = (1 << len(policy.required_sets)) - 1
+    parts = []
+    have = 0
+    while have < count:
+        raw = np.frombuffer(os.urandom(min(_raw_needed(policy, count - have), BUFFER_BYTES)), np.uint8)
+        raw = raw[raw < policy.limit]
+        rows = len(raw) // length
+        idx = (raw[:rows * length] % n).reshape(rows, length)
+        if policy.required_sets:
+            idx = idx[np.bitwise_or.reduce(bits[idx], axis=1) == full]
+        idx = idx[:count - have]
+        parts.append(alpha[idx])
+        have += len(idx)
+    return np.concatenate(parts).tobytes()
+
+
+def draw(policy, count, reject=None):
+    """count passwords as one latin-1 byte string, policy.length bytes each.
+
+    reject(password) -> True drops a password and draws a replacement (e.g.
+    BreachIndex.contains from breach.py).
+    """
+    sampler = _draw_numpy if np is not None else _draw_python
+    data = sampler(policy, count)
+    if reject is None:
+        return data
+    length = policy.length
+    kept = []
+    while True:
+        kept += [pw for pw in (data[i:i + length] for i in range(0, len(data), length))
+                 if not reject(pw.decode("latin-1"))]
+        if len(kept) >= count:
+            return b"".join(kept[:count])
+        data = sampler(policy, count - len(kept))
+
+
+def generate(count, policy=None, reject=None):
+    """List of count passwords."""
+    policy = policy or Policy()
+    data = draw(policy, count, reject).decode("latin-1")
+    length = policy.length
+    return [data[i:i + length] for i in range(0, len(data), length)]
+
+
+def generate_password(policy=None, reject=None):
+    return generate(1, policy, reject)[0]
+
+
+def _block_text(args):
+    policy, count, reject = args
+    data = draw(policy, count, reject)
+    length = policy.length
+    return b"\n".join(data[i:i + length] for i in range(0, len(data), length)) + b"\n"
+
+
+def write_passwords(count, policy, out, workers=1, on_progress=None, reject=None):
+    """Write count passwords, one per line, to the binary stream out.
+
+    Work is split into blocks of BLOCK passwords; with workers > 1 the blocks are
+    generated in separate processes and written in order as they finish (reject must
+    then be picklable).
+    """
+    blocks = [(policy, min(BLOCK, count - i), reject) for i in range(0, count, BLOCK)]
+    done = 0
+    if workers > 1 and len(blocks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for (_, n, _), text in zip(blocks, pool.map(_block_text, blocks)):
+                out.write(text)
+                done += n
+                if on_progress:
+                    on_progress(done, count)
+    else:
+        for block in blocks:
+            out.write(_block_text(block))
+            done += block[1]
+            if on_progress:
+                on_progress(done, count)
+    return done
@@ -328,13 +328,11 @@ class FileExplorer(QMainWindow):
         dlg.exec()
 
 
-# ---------------- Main ---------------- #
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    app.setStyle("Fusion")
-
-    # Dark theme
+# ---------------- Theme ---------------- #
+def apply_dark_theme(app):
+    """Fusion style with the dark palette, shared with xi_launcher."""
     from PyQt6.QtGui import QPalette
+    app.setStyle("Fusion")
     palette = QPalette()
     palette.setColor(QPalette.ColorRole.Window, QColor(53, 53, 53))
     palette.setColor(QPalette.ColorRole.WindowText, QColor(220, 220, 220))
@@ -349,6 +347,12 @@ if __name__ == "__main__":
     palette.setColor(QPalette.ColorRole.HighlightedText, QColor(0, 0, 0))
     app.setPalette(palette)
 
+
+# ---------------- Main ---------------- #
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    apply_dark_theme(app)
+
     window = FileExplorer()
     window.show()
     sys.exit(app.exec())
@@ -9,6 +9,7 @@ Features:
 - Select / move / delete nodes & edges
 - Save / load to JSON
 - Export canvas to PNG
+- Headless batch rendering of saved JSON files to PNG / SVG
 
 Dependencies:
 - PyQt6
@@ -16,22 +17,31 @@ Dependencies:
 Run:
 python xi_flowchart.py
 
+Batch render (no window, uses the offscreen Qt platform):
+python xi_flowchart.py render charts/*.json -o out/ --format svg --jobs 8
+
 """
 
 import sys
+import os
 import json
 import math
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QFileDialog, QGraphicsView, QGraphicsScene, QGraphicsItem, QGraphicsRectItem,
     QGraphicsTextItem, QGraphicsLineItem, QInputDialog, QMessageBox, QLabel
 )
-from PyQt6.QtGui import QPen, QBrush, QColor, QPainterPath, QPainter, QPixmap
-from PyQt6.QtCore import Qt, QPointF, QRectF
+from PyQt6.QtGui import QPen, QBrush, QColor, QPainterPath, QPainter, QImage
+from PyQt6.QtCore import Qt, QPointF, QRectF, QSize
 
 
 NODE_WIDTH = 160
 NODE_HEIGHT = 60
+EXPORT_MARGIN = 20
 
 
 class NodeItem(QGraphicsRectItem):
@@ -296,13 +306,7 @@ class MainWindow(QMainWindow):
         path, _ = QFileDialog.getSaveFileName(self, 'Export PNG', filter='PNG Files (*.png)')
         if not path:
             return
-        rect = self.scene.itemsBoundingRect()
-        img = QPixmap(int(rect.width()) + 20, int(rect.height()) + 20)
-        img.fill(QColor(30, 30, 30))
-        painter = QPainter(img)
-        self.scene.render(painter, target=QRectF(img.rect()), source=rect)
-        painter.end()
-        img.save(path)
+        render_png(self.scene, path)
 
     def clear_all(self):
         ok = QMessageBox.question(self, 'Clear', 'Clear the canvas?')
@@ -310,6 +314,118 @@ class MainWindow(QMainWindow):
             self.scene.clear_all()
 
 
+def render_png(scene, path):
+    rect = scene.itemsBoundingRect()
+    img = QImage(int(rect.width()) + EXPORT_MARGIN, int(rect.height()) + EXPORT_MARGIN,
+                 QImage.Format.Format_ARGB32)
+    img.fill(QColor(30, 30, 30))
+    painter = QPainter(img)
+    painter.setRenderHints(QPainter.RenderHint.Antialiasing | QPainter.RenderHint.TextAntialiasing)
+    scene.render(painter, target=QRectF(img.rect()), source=rect)
+    painter.end()
+    if not img.save(path):
+        raise OSError(f'could not write {path}')
+
+
+def render_svg(scene, path):
+    from PyQt6.QtSvg import QSvgGenerator  # only needed for SVG output
+    rect = scene.itemsBoundingRect()
+    width = int(rect.width()) + EXPORT_MARGIN
+    height = int(rect.height()) + EXPORT_MARGIN
+    gen = QSvgGenerator()
+    gen.setFileName(path)
+    gen.setSize(QSize(width, height))
+    gen.setViewBox(QRectF(0, 0, width, height))
+    gen.setTitle(os.path.basename(path))
+    painter = QPainter(gen)
+    if not painter.isActive():  # the generator could not open the file
+        raise OSError(f'could not write {path}')
+    painter.fillRect(QRectF(0, 0, width, height), QColor(30, 30, 30))
+    scene.render(painter, target=QRectF(0, 0, width, height), source=rect)
+    if not painter.end():
+        raise OSError(f'could not write {path}')
+
+
+RENDERERS = {'png': render_png, 'svg': render_svg}
+
+# one QApplication per pool worker, created by _init_render_worker
+_worker_app = None
+
+
+def _init_render_worker():
+    global _worker_app
+    os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+    _worker_app = QApplication.instance() or QApplication([])
+
+
+def output_paths(paths, out_dir, fmt):
+    """{input: output path}. Without out_dir outputs go next to their inputs. With it,
+    inputs that share a file name keep their folders (relative to the folder all inputs
+    have in common) so they don't overwrite each other."""
+    def output(path):
+        return os.path.splitext(path)[0] + '.' + fmt
+    if not out_dir:
+        return {p: output(p) for p in paths}
+    names = {p: os.path.basename(output(p)) for p in paths}
+    if len(set(names.values())) == len(names):
+        return {p: os.path.join(out_dir, name) for p, name in names.items()}
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths])
+    return {p: os.path.join(out_dir, os.path.relpath(output(os.path.abspath(p)), root)) for p in paths}
+
+
+def render_file(path, out_path, fmt='png'):
+    """Render one saved flowchart to out_path. Returns (path, output, seconds, error)."""
+    start = time.perf_counter()
+    try:
+        os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        scene = FlowScene()
+        scene.from_dict(data)
+        RENDERERS[fmt](scene, out_path)
+        scene.clear_all()
+        error = None
+    except Exception as e:
+        out_path, error = None, str(e)
+    return path, out_path, time.perf_counter() - start, error
+
+
+def render_batch(paths, out_dir=None, fmt='png', jobs=None):
+    """Render many files across a process pool. Yields render_file results as they finish."""
+    outputs = output_paths(paths, out_dir, fmt)
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(paths)))
+    # spawn so each worker builds its own Qt state instead of inheriting ours
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=ctx, initializer=_init_render_worker) as pool:
+        futures = [pool.submit(render_file, p, outputs[p], fmt) for p in paths]
+        for fut in as_completed(futures):
+            yield fut.result()
+
+
+def render_main(argv=None):
+    parser = argparse.ArgumentParser(prog='xi_flowchart.py render',
+                                     description='Render saved flowchart JSON files without opening a window.')
+    parser.add_argument('files', nargs='+', help='flowchart .json files')
+    parser.add_argument('-o', '--out-dir', help='output folder (default: next to each input)')
+    parser.add_argument('-f', '--format', choices=sorted(RENDERERS), default='png')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    done = failed = 0
+    for path, out_path, seconds, error in render_batch(args.files, args.out_dir, args.format, args.jobs):
+        if error:
+            failed += 1
+            print(f'FAIL {path} ({seconds * 1000:.1f} ms): {error}', file=sys.stderr)
+        else:
+            done += 1
+            print(f'ok   {path} -> {out_path} ({seconds * 1000:.1f} ms)')
+    total = time.perf_counter() - start
+    rate = (done + failed) / total if total > 0 else 0.0
+    print(f'{done} rendered, {failed} failed in {total:.2f} s ({rate:.1f} files/s)')
+    return 1 if failed else 0
+
+
 def main():
     app = QApplication(sys.argv)
     w = MainWindow()
@@ -318,4 +434,6 @@ def main():
 
 
 if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'render':
+        sys.exit(render_main(sys.argv[2:]))
     main()
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+bench_catalog.py
+
+XiInstaller startup (time until the first app is listed) and selection latency
+(time until a preview pixmap is ready): the old listdir + full PNG decode vs the
+cached catalog + pre-scaled previews + LRU.
+
+Run (no window is shown):
+python bench_catalog.py --apps 300
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication, QListWidget
+from PyQt6.QtGui import QImage, QPixmap, QColor
+from PyQt6.QtCore import Qt
+
+from catalog import Catalog, PREVIEW_SIZE, preview_is_fresh
+
+
+def make_programs(folder, count, exe_kb, png_size):
+    image = QImage(png_size, png_size, QImage.Format.Format_RGB32)
+    for i in range(count):
+        image.fill(QColor(i % 255, 80, 160))
+        with open(os.path.join(folder, f"App{i:04d}.exe"), "wb") as f:
+            f.write(os.urandom(exe_kb * 1024))
+        image.save(os.path.join(folder, f"App{i:04d}.png"))
+
+
+def old_startup(programs_dir):
+    start = time.perf_counter()
+    apps = [f for f in os.listdir(programs_dir) if f.endswith(".exe")]
+    view = QListWidget()
+    view.addItems(apps)
+    return time.perf_counter() - start
+
+
+def catalog_startup(programs_dir, cache_root):
+    start = time.perf_counter()
+    entries = Catalog(programs_dir, cache_root).load()
+    view = QListWidget()
+    view.addItems(list(entries))
+    return time.perf_counter() - start
+
+
+def old_select(programs_dir, name):
+    start = time.perf_counter()
+    QPixmap(os.path.join(programs_dir, name.replace(".exe", ".png"))).scaled(
+        300, 300, Qt.AspectRatioMode.KeepAspectRatio)
+    return time.perf_counter() - start
+
+
+def cached_select(entry):
+    start = time.perf_counter()
+    if preview_is_fresh(entry):
+        image = QImage(entry["preview"])
+    else:
+        image = QImage(entry["preview_src"]).scaled(PREVIEW_SIZE, PREVIEW_SIZE, Qt.AspectRatioMode.KeepAspectRatio)
+        os.makedirs(os.path.dirname(entry["preview"]), exist_ok=True)
+        image.save(entry["preview"])
+    QPixmap.fromImage(image)
+    return time.perf_counter() - start
+
+
+def ms(seconds):
+    return f"{seconds * 1000:8.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--apps", type=int, default=300)
+    parser.add_argument("--exe-kb", type=int, default=512)
+    parser.add_argument("--png-size", type=int, default=1600)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    root = tempfile.mkdtemp()
+    try:
+        programs_dir = os.path.join(root, "programs")
+        cache_root = os.path.join(root, "cache")
+        os.makedirs(programs_dir)
+        make_programs(programs_dir, args.apps, args.exe_kb, args.png_size)
+
+        print(f"startup, {args.apps} apps")
+        print(f"  listdir (old)          {ms(old_startup(programs_dir))}")
+        print(f"  catalog cold (rebuild) {ms(catalog_startup(programs_dir, cache_root))}")
+        print(f"  catalog warm           {ms(catalog_startup(programs_dir, cache_root))}")
+
+        entries = Catalog(programs_dir, cache_root).load()
+        names = list(entries)[:20]
+        old = sum(old_select(programs_dir, n) for n in names) / len(names)
+        first = sum(cached_select(entries[n]) for n in names) / len(names)
+        warm = sum(cached_select(entries[n]) for n in names) / len(names)
+        cache = {n: QPixmap() for n in names}
+        start = time.perf_counter()
+        for n in names:
+            cache.get(n)
+        hit = (time.perf_counter() - start) / len(names)
+
+        print(f"selection, {args.png_size}px previews (mean of {len(names)})")
+        print(f"  full decode + scale (old) {ms(old)}")
+        print(f"  first view (pre-scale)    {ms(first)}")
+        print(f"  pre-scaled from disk      {ms(warm)}")
+        print(f"  LRU hit                   {ms(hit)}")
+    finally:
+        shutil.rmtree(root)
+        del app
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+bench_download.py
+
+Download throughput vs. number of Range chunks against the local fake server,
+with injected per-request latency, a per-connection bandwidth cap (as real servers
+and long links have) and dropped connections.
+
+Run:
+python bench_download.py --size-mb 200 --latency 0.02 --drop 0.05 --rate-mb 20
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+from fake_server import FakeServer
+from downloader import ConnectionPool, download
+
+CHUNK_COUNTS = (1, 2, 4, 8, 16)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--drop", type=float, default=0.05)
+    parser.add_argument("--rate-mb", type=float, default=20, help="MB/s per connection, 0 = unlimited")
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    try:
+        folder = os.path.join(root, "files")
+        os.makedirs(folder)
+        with open(os.path.join(folder, "Big.exe"), "wb") as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1024 * 1024))
+        server = FakeServer(folder, latency=args.latency, drop=args.drop,
+                            rate=int(args.rate_mb * 1e6), seed=42).start()
+        sha = server.sha256(os.path.join(folder, "Big.exe"))
+        size = args.size_mb * 1024 * 1024
+
+        print(f"{args.size_mb} MiB, latency {args.latency * 1000:.0f} ms, drop {args.drop:.0%}, "
+              f"{args.rate_mb:g} MB/s per connection")
+        print(f"{'chunks':>6} {'seconds':>8} {'MB/s':>8} {'requests':>9} {'conns':>6}")
+        for chunks in CHUNK_COUNTS:
+            best = None
+            requests = server.requests
+            connections = server.connections
+            for _ in range(args.repeat):
+                dest = os.path.join(root, f"Big-{chunks}.exe")
+                pool = ConnectionPool()
+                start = time.perf_counter()
+                download(pool, server.url + "files/Big.exe", dest, sha, chunks)
+                elapsed = time.perf_counter() - start
+                pool.close()
+                os.remove(dest)
+                best = elapsed if best is None else min(best, elapsed)
+            print(f"{chunks:>6} {best:>8.3f} {size / best / 1e6:>8.1f} "
+                  f"{(server.requests - requests) // args.repeat:>9} "
+                  f"{(server.connections - connections) // args.repeat:>6}")
+        server.stop()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+bench_install.py
+
+Install throughput of InstallEngine for 1, 5 and 20 apps on tmpfs vs disk.
+
+Run:
+python bench_install.py --size-mb 50 --disk-dir ~/bench_tmp
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+from install_engine import InstallEngine, InstallJob, sha256_file
+
+APP_COUNTS = (1, 5, 20)
+
+
+def make_programs(folder, count, size):
+    paths = {}
+    block = os.urandom(1024 * 1024)
+    for i in range(count):
+        name = f"BenchApp{i}.exe"
+        path = os.path.join(folder, name)
+        with open(path, "wb") as f:
+            left = size
+            while left > 0:
+                f.write(block[:min(left, len(block))])
+                left -= len(block)
+        paths[name] = path
+    return paths
+
+
+def run(programs, target_root, count, workers):
+    install_folder = tempfile.mkdtemp(dir=target_root)
+    names = sorted(programs)[:count]
+    jobs = [InstallJob(n, programs[n], install_folder) for n in names]
+    engine = InstallEngine(max_workers=workers)
+    start = time.perf_counter()
+    results = engine.install_batch(jobs)
+    elapsed = time.perf_counter() - start
+    shutil.rmtree(install_folder)
+    failed = [r for r in results if not r.ok]
+    if failed:
+        raise SystemExit(f"install failed: {failed[0].error}")
+    return elapsed, sum(j.size for j in jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=20, help="size of each synthetic app")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--tmpfs-dir", default="/dev/shm")
+    parser.add_argument("--disk-dir", default=tempfile.gettempdir())
+    args = parser.parse_args()
+
+    src_root = tempfile.mkdtemp()
+    try:
+        programs = make_programs(src_root, max(APP_COUNTS), args.size_mb * 1024 * 1024)
+        # warm the page cache so we measure the install side
+        for p in programs.values():
+            sha256_file(p)
+
+        print(f"{'target':<8} {'apps':>5} {'seconds':>9} {'MB/s':>9}")
+        for label, root in (("tmpfs", args.tmpfs_dir), ("disk", args.disk_dir)):
+            if not os.path.isdir(root):
+                print(f"{label:<8} skipped ({root} missing)")
+                continue
+            for count in APP_COUNTS:
+                elapsed, total = run(programs, root, count, args.workers)
+                print(f"{label:<8} {count:>5} {elapsed:>9.3f} {total / elapsed / 1e6:>9.1f}")
+    finally:
+        shutil.rmtree(src_root)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+bench_package.py
+
+Raw .exe copy vs .xipkg package: bundle size, install time and peak memory.
+Each install runs in a fresh child process so ru_maxrss is its own peak.
+
+Run:
+python bench_package.py --size-mb 64 --files 16
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+import xipkg
+from install_engine import InstallEngine, InstallJob
+
+
+def make_app(folder, size_mb, files):
+    """Executable-like mix: some incompressible bytes, lots of padding and repeated tables."""
+    os.makedirs(os.path.join(folder, "data"))
+    chunk = 1024 * 1024
+    with open(os.path.join(folder, "App.exe"), "wb") as f:
+        for i in range(size_mb):
+            f.write(os.urandom(chunk // 4) + bytes(chunk // 4) + (b"\x48\x89\xe5\x90" * (chunk // 8)))
+    for i in range(files):
+        with open(os.path.join(folder, "data", f"asset{i}.bin"), "wb") as f:
+            f.write((f"asset {i} ".encode() * 1000 + os.urandom(4096)) * 64)
+
+
+def peak_rss():
+    # VmHWM belongs to this process image; ru_maxrss on Linux survives exec from the parent
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def child(mode, src, install_folder, workers):
+    engine = InstallEngine(max_workers=workers)
+    start = time.perf_counter()
+    result = engine.install_batch([InstallJob(os.path.basename(src), src, install_folder)])[0]
+    elapsed = time.perf_counter() - start
+    if not result.ok:
+        raise SystemExit(f"{mode}: {result.error}")
+    print(json.dumps({"seconds": elapsed, "peak_rss": peak_rss()}))
+
+
+def run_child(mode, src, install_folder, workers):
+    out = subprocess.run([sys.executable, __file__, "--child", mode, src, install_folder, str(workers)],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        return child(sys.argv[2], sys.argv[3], sys.argv[4], int(sys.argv[5]))
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--files", type=int, default=16, help="extra asset files in the package")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    try:
+        app_dir = os.path.join(root, "app")
+        make_app(app_dir, args.size_mb, args.files)
+        raw_exe = os.path.join(app_dir, "App.exe")
+        raw_total = sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(app_dir) for f in fs)
+        package = os.path.join(root, "App.xipkg")
+        start = time.perf_counter()
+        xipkg.build_package(app_dir, package, "App.exe")
+        build_time = time.perf_counter() - start
+
+        print(f"bundle: raw {raw_total / 1e6:.1f} MB, xipkg {os.path.getsize(package) / 1e6:.1f} MB "
+              f"(built in {build_time:.1f} s)")
+        print(f"{'mode':<10} {'seconds':>8} {'peak RSS MB':>12}")
+        raw = run_child("raw", raw_exe, os.path.join(root, "install_raw"), args.workers)
+        print(f"{'raw copy':<10} {raw['seconds']:>8.3f} {raw['peak_rss'] / 1e6:>12.1f}  (App.exe only)")
+        for workers in sorted({1, args.workers}):
+            pkg = run_child("xipkg", package, os.path.join(root, f"install_pkg{workers}"), workers)
+            print(f"{'xipkg x' + str(workers):<10} {pkg['seconds']:>8.3f} {pkg['peak_rss'] / 1e6:>12.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+bench_scheduler.py
+
+Makespan of the dependency scheduler on wide and deep graphs, sequential vs parallel.
+
+- wide: one shared runtime, N apps that each need it
+- deep: a chain, every app needs the previous one
+- diamond layers: L layers of W apps, each app needs every app in the layer before
+
+Run:
+python bench_scheduler.py --apps 40 --size-mb 8 --jobs 8 --io 4
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+from install_engine import InstallEngine, InstallJob
+from scheduler import Scheduler, resolve
+
+
+def wide(n):
+    graph = {"Runtime.exe": set()}
+    graph.update({f"App{i}.exe": {"Runtime.exe"} for i in range(n - 1)})
+    return graph
+
+
+def deep(n):
+    return {f"App{i}.exe": ({f"App{i - 1}.exe"} if i else set()) for i in range(n)}
+
+
+def layers(n, width=5):
+    graph = {}
+    previous = set()
+    for i in range(n):
+        name = f"App{i}.exe"
+        graph[name] = set(previous)
+        if i % width == width - 1:
+            previous = {f"App{j}.exe" for j in range(i - width + 1, i + 1)}
+    return graph
+
+
+def run(graph, programs, root, jobs, io):
+    folder = tempfile.mkdtemp(dir=root)
+    install_jobs = {app: InstallJob(app, programs[app], folder) for app in graph}
+    scheduler = Scheduler(max_parallel=jobs, io_limit=io, engine=InstallEngine(max_workers=io))
+    graph = resolve(list(graph), lambda app: graph[app])
+    start = time.perf_counter()
+    results = scheduler.run(install_jobs, graph)
+    makespan = time.perf_counter() - start
+    shutil.rmtree(folder)
+    failed = [r for r in results if not r.ok]
+    if failed:
+        raise SystemExit(f"{failed[0].job.app_name}: {failed[0].error}")
+    return makespan
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--apps", type=int, default=40)
+    parser.add_argument("--size-mb", type=int, default=8)
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--io", type=int, default=4)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    try:
+        src = os.path.join(root, "programs")
+        os.makedirs(src)
+        block = os.urandom(1024 * 1024)
+        programs = {}
+        for name in set(wide(args.apps)) | set(deep(args.apps)):
+            path = os.path.join(src, name)
+            with open(path, "wb") as f:
+                for _ in range(args.size_mb):
+                    f.write(block)
+            programs[name] = path
+
+        print(f"{args.apps} apps x {args.size_mb} MiB")
+        print(f"{'graph':<8} {'sequential':>11} {'parallel':>9} {'speedup':>8}")
+        for label, graph in (("wide", wide(args.apps)), ("deep", deep(args.apps)), ("layers", layers(args.apps))):
+            seq = run(graph, programs, root, 1, 1)
+            par = run(graph, programs, root, args.jobs, args.io)
+            print(f"{label:<8} {seq:>10.3f}s {par:>8.3f}s {seq / par:>7.2f}x")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
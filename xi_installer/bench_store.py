@@ -0,0 +1,100 @@
+"""
+bench_store.py
+
+Plain copy vs PackageStore installs on a synthetic binary with small edits:
+first install, reinstall, and upgrade through a block delta, plus disk usage.
+Without reflinks the store keeps its own copy of each version, so expect it to use
+more disk than plain copies; the delta only saves what programs/ has to ship.
+
+Run:
+python bench_store.py --size-mb 100 --dir ~/bench_tmp
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+from install_engine import InstallEngine, InstallJob, sha256_file
+from package_store import PackageStore, make_delta, reflink
+
+
+def disk_usage(root):
+    """Allocated bytes under root (shared reflink extents are counted per file)."""
+    total = 0
+    for folder, _dirs, files in os.walk(root):
+        for name in files:
+            total += os.lstat(os.path.join(folder, name)).st_blocks * 512
+    return total
+
+
+def edited_copy(src, dst, edits):
+    data = bytearray(open(src, "rb").read())
+    step = len(data) // (edits + 1)
+    for i in range(1, edits + 1):
+        data[i * step:i * step + 64] = os.urandom(64)
+    # one insertion so the tail is shifted, as a recompiled binary would be
+    data[step // 2:step // 2] = b"v2" * 50
+    with open(dst, "wb") as f:
+        f.write(data)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=100)
+    parser.add_argument("--edits", type=int, default=10)
+    parser.add_argument("--dir", default=tempfile.gettempdir(), help="filesystem to benchmark on")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(dir=args.dir)
+    try:
+        programs = os.path.join(root, "programs")
+        os.makedirs(programs)
+        v1 = os.path.join(programs, "App.exe")
+        with open(v1, "wb") as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1024 * 1024))
+        v2_dir = os.path.join(root, "programs_v2")
+        os.makedirs(v2_dir)
+        v2 = os.path.join(v2_dir, "App.exe")
+        edited_copy(v1, v2, args.edits)
+        v1_sha, v2_sha = sha256_file(v1), sha256_file(v2)
+
+        delta = os.path.join(v2_dir, "App.xidelta")
+        t_delta = timed(lambda: make_delta(v1, v2, delta))
+        print(f"delta: {os.path.getsize(delta) / 1024:.1f} KiB for {args.size_mb} MiB "
+              f"({args.edits} edits + 1 insert), built in {t_delta:.2f} s")
+
+        print(f"{'mode':<7} {'install':>9} {'reinstall':>10} {'upgrade':>9} {'disk MiB':>9}")
+        for mode in ("copy", "store"):
+            folder = os.path.join(root, "install_" + mode)
+            store = PackageStore(os.path.join(folder, ".xistore")) if mode == "store" else None
+            engine = InstallEngine(store=store)
+
+            def install(src, sha, delta_path=None):
+                r = engine.install_batch([InstallJob("App.exe", src, folder, sha, delta_path)])[0]
+                if not r.ok:
+                    raise SystemExit(f"{mode}: {r.error}")
+
+            t_install = timed(lambda: install(v1, v1_sha))
+            t_reinstall = timed(lambda: install(v1, v1_sha))
+            t_upgrade = timed(lambda: install(v2, v2_sha, delta))
+            if store:
+                store.gc({v2_sha})  # only the upgraded version is still installed
+            usage = disk_usage(folder) / (1024 * 1024)
+            print(f"{mode:<7} {t_install:>9.3f} {t_reinstall:>10.3f} {t_upgrade:>9.3f} {usage:>9.1f}")
+        print(f"reflinks on this filesystem: {'yes' if reflink(v1, os.path.join(root, 'probe')) else 'no'}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+catalog.py
+
+Cached program catalog for XiInstaller.
+
+The catalog (name, size, sha256, version, dependencies, preview paths of every .exe
+and .xipkg) is stored as JSON in the user cache folder. Each load stats the programs
+folder, manifest.json and every listed program; files whose size and mtime are
+unchanged keep their old hash, so only new or replaced programs are read. Pre-scaled
+previews live next to the catalog and are produced lazily by the GUI (see
+XiInstaller.PreviewLoader). Packages that can't be read are left out (Catalog.skipped)
+with a warning on stderr instead of failing the whole load.
+
+"sha256" is whatever the file hashed to when it was scanned. Only "manifest_sha256",
+taken from the publisher's manifest.json, is an integrity expectation for installs.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import zipfile
+
+from install_engine import sha256_file, load_manifest, MANIFEST_NAME
+from xipkg import PACKAGE_EXT, PackageError, read_manifest
+
+CATALOG_VERSION = 5
+CATALOG_NAME = "catalog.json"
+PREVIEW_SIZE = 300
+
+
+def cache_dir():
+    base = os.getenv("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "XiInstaller")
+
+
+def _cache_key(programs_dir):
+    # one catalog per programs folder (bundled vs. source checkout)
+    return hashlib.sha1(os.path.abspath(programs_dir).encode("utf-8")).hexdigest()[:12]
+
+
+class Catalog:
+    def __init__(self, programs_dir, cache_root=None):
+        self.programs_dir = programs_dir
+        self.root = os.path.join(cache_root or cache_dir(), _cache_key(programs_dir))
+        self.path = os.path.join(self.root, CATALOG_NAME)
+        self.preview_dir = os.path.join(self.root, "previews")
+        self.entries = {}
+        self.skipped = {}  # unreadable packages: {app_name: {"path", "size", "mtime", "error"}}
+
+    def load(self):
+        """Return {app_name: entry}, rebuilding the catalog only if programs/ changed."""
+        os.makedirs(self.programs_dir, exist_ok=True)
+        dir_mtime = os.stat(self.programs_dir).st_mtime_ns
+        manifest_mtime = _mtime(os.path.join(self.programs_dir, MANIFEST_NAME))
+        cached = self._read()
+        if (cached and cached.get("version") == CATALOG_VERSION and cached.get("dir_mtime") == dir_mtime
+                and cached.get("manifest_mtime") == manifest_mtime and _unchanged(cached["apps"])
+                and _unchanged(cached["skipped"])):
+            self.entries, self.skipped = cached["apps"], cached["skipped"]
+        else:
+            self.entries, self.skipped = self._rebuild((cached or {}).get("apps", {}))
+            self._write({"version": CATALOG_VERSION, "dir_mtime": dir_mtime, "manifest_mtime": manifest_mtime,
+                         "apps": self.entries, "skipped": self.skipped})
+        return self.entries
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, data):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def _rebuild(self, previous):
+        manifest = load_manifest(self.programs_dir)
+        apps = {}
+        skipped = {}
+        with os.scandir(self.programs_dir) as it:
+            for entry in it:
+                if not entry.name.endswith((".exe", PACKAGE_EXT)) or not entry.is_file():
+                    continue
+                st = entry.stat()
+                old = previous.get(entry.name, {})
+                info = manifest.get(entry.name, {})
+                version = info.get("version")
+                depends = info.get("depends", [])
+                if entry.name.endswith(PACKAGE_EXT):
+                    try:
+                        pkg = read_manifest(entry.path)
+                    except (zipfile.BadZipFile, PackageError, ValueError, EOFError, OSError) as e:
+                        # a corrupt or half-copied package must not hide the rest of the catalog;
+                        # it is retried once its size or mtime changes
+                        print(f"warning: skipping {entry.path}: {e}", file=sys.stderr)
+                        skipped[entry.name] = {"path": entry.path, "size": st.st_size,
+                                               "mtime": st.st_mtime_ns, "error": str(e)}
+                        continue
+                    version = version or pkg.get("version")
+                    depends = depends or pkg.get("depends", [])
+                published = info.get("sha256")
+                if published:
+                    sha = published.lower()
+                elif old.get("size") == st.st_size and old.get("mtime") == st.st_mtime_ns:
+                    sha = old.get("sha256")
+                else:
+                    sha = sha256_file(entry.path)
+                stem = os.path.splitext(entry.name)[0]
+                preview_src = os.path.join(self.programs_dir, stem + ".png")
+                apps[entry.name] = {
+                    "path": entry.path,
+                    "size": st.st_size,
+                    "mtime": st.st_mtime_ns,
+                    "sha256": sha,
+                    "manifest_sha256": published,
+                    "version": version,
+                    "depends": depends,
+                    "preview_src": preview_src if os.path.exists(preview_src) else None,
+                    "preview": os.path.join(self.preview_dir, f"{stem}-{PREVIEW_SIZE}.png"),
+                }
+        return dict(sorted(apps.items())), skipped
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _unchanged(apps):
+    """True if every cataloged program still has its recorded size and mtime.
+
+    Overwriting a file in place doesn't touch the folder's mtime, so the folder check
+    alone would keep serving the old hash.
+    """
+    for entry in apps.values():
+        try:
+            st = os.stat(entry["path"])
+        except OSError:
+            return False
+        if st.st_size != entry["size"] or st.st_mtime_ns != entry["mtime"]:
+            return False
+    return True
+
+
+def preview_is_fresh(entry):
+    """True if the pre-scaled preview exists and is newer than its source image."""
+    try:
+        return os.stat(entry["preview"]).st_mtime_ns >= os.stat(entry["preview_src"]).st_mtime_ns
+    except (OSError, TypeError):
+        return False
@@ -0,0 +1,183 @@
+"""
+cli.py
+
+Headless XiInstaller for scripted provisioning (no Qt, no windows).
+
+Examples:
+python cli.py list
+python cli.py install XiExplorer.exe Blocker.xipkg --to C:/XiApps --jobs 4 --io 2
+python cli.py install --all --to /srv/xiapps --dry-run
+python cli.py verify
+python cli.py download --server http://www.strombackfamily.com:8080
+
+Dependencies declared in the catalog are installed first, each shared one only once.
+Exit status is 0 when every requested app (and its dependencies) installed.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from catalog import Catalog
+from state_db import StateDB, OK, data_dir
+from install_engine import InstallEngine, InstallJob
+from package_store import PackageStore
+from scheduler import Scheduler, DependencyError, resolve, prune_installed, topological_order
+from downloader import sync_catalog
+
+STORE_DIR = ".xistore"
+DEFAULT_FOLDER = os.path.join(os.path.expanduser("~"), "AppData", "Local", "XiApps")
+
+
+def load_entries(programs_dirs):
+    entries = {}
+    for folder in programs_dirs:
+        entries.update(Catalog(folder).load())
+    return entries
+
+
+def cmd_list(args, entries, state):
+    installed = state.paths()
+    for name, entry in sorted(entries.items()):
+        flag = "*" if name in installed else " "
+        deps = f"  needs {', '.join(entry['depends'])}" if entry.get("depends") else ""
+        print(f"{flag} {name:<32} {entry['size']:>12,} B  {entry.get('version') or '':<8}{deps}")
+    return 0
+
+
+def cmd_install(args, entries, state):
+    targets = sorted(entries) if args.all else args.apps
+    if not targets:
+        print("nothing to install (give app names or --all)", file=sys.stderr)
+        return 2
+
+    def depends_of(app):
+        return entries[app].get("depends", [])
+
+    try:
+        graph = resolve(targets, depends_of)
+    except DependencyError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if not args.reinstall_deps:
+        graph = prune_installed(graph, state.paths(), set(targets))
+    order = topological_order(graph)
+    if args.dry_run:
+        for app in order:
+            deps = sorted(graph[app])
+            print(f"{app}" + (f"  after {', '.join(deps)}" if deps else ""))
+        return 0
+
+    folder = os.path.abspath(args.to)
+    jobs = {}
+    for app in order:
+        entry = entries[app]
+        delta = os.path.splitext(entry["path"])[0] + ".xidelta"
+        jobs[app] = InstallJob(app, entry["path"], folder, entry.get("manifest_sha256"),
+                               delta if os.path.exists(delta) else None)
+
+    store = None if args.no_store else PackageStore(os.path.join(folder, STORE_DIR))
+    engine = InstallEngine(max_workers=args.io, store=store)
+    started = {}
+
+    def on_start(app):
+        started[app] = time.perf_counter()
+        if args.verbose:
+            print(f"  start {app}")
+
+    def on_done(result):
+        app = result.job.app_name
+        took = time.perf_counter() - started.get(app, time.perf_counter())
+        if result.ok:
+            print(f"ok    {app} -> {result.job.target_path} ({took:.2f} s)")
+        else:
+            print(f"FAIL  {app}: {result.error}", file=sys.stderr)
+
+    scheduler = Scheduler(max_parallel=args.jobs, io_limit=args.io, engine=engine,
+                          on_start=on_start, on_done=on_done)
+    start = time.perf_counter()
+    try:
+        # on Ctrl+C the scheduler keeps the installs that completed and rolls back the rest
+        results = scheduler.run(jobs, graph)
+    finally:
+        ok = [r for r in scheduler.results if r.ok]
+        state.record_installs([(r.job.app_name, r.job.target_path, r.sha256) for r in ok])
+        if store is not None:
+            # objects of replaced versions that no install uses any more
+            store.gc(state.hashes())
+    makespan = time.perf_counter() - start
+
+    total = sum(r.job.size for r in ok)
+    print(f"{len(ok)}/{len(results)} installed, {total / 1e6:.1f} MB in {makespan:.2f} s")
+    return 0 if len(ok) == len(results) else 1
+
+
+def cmd_verify(args, entries, state):
+    status = state.verify()
+    bad = 0
+    for name, s in sorted(status.items()):
+        if s != OK or args.verbose:
+            print(f"{s:<9} {name}")
+        bad += s != OK
+    print(f"{len(status) - bad}/{len(status)} intact")
+    return 1 if bad else 0
+
+
+def cmd_download(args, entries, state):
+    def progress(name, done, total):
+        if done == total:
+            print(f"downloaded {name} ({total:,} B)")
+
+    failed = []
+
+    def error(name, e):
+        failed.append(name)
+        print(f"FAIL  {name}: {e}", file=sys.stderr)
+
+    paths = sync_catalog(args.server, args.downloads, chunks=args.chunks, on_progress=progress, on_error=error)
+    print(f"{len(paths)} app(s) downloaded to {args.downloads}")
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cli.py", description="Headless Xi Installer")
+    parser.add_argument("--programs", action="append",
+                        help="programs folder (repeatable; default: ./programs and the downloads folder)")
+    parser.add_argument("--downloads", default=os.path.join(data_dir(), "programs"))
+    parser.add_argument("--db", help="state database (default: user data folder)")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="show the catalog, * = installed")
+
+    install = sub.add_parser("install", help="install apps and their dependencies")
+    install.add_argument("apps", nargs="*")
+    install.add_argument("--all", action="store_true")
+    install.add_argument("--to", default=DEFAULT_FOLDER, help="install folder")
+    install.add_argument("-j", "--jobs", type=int, default=4, help="apps installed at once")
+    install.add_argument("--io", type=int, default=2, help="files written at once, across all apps")
+    install.add_argument("--reinstall-deps", action="store_true", help="also reinstall dependencies already present")
+    install.add_argument("--no-store", action="store_true", help="plain copies instead of the package store")
+    install.add_argument("--dry-run", action="store_true", help="print the install order and exit")
+
+    sub.add_parser("verify", help="check installed files (stat first, rehash only changed ones)")
+
+    download = sub.add_parser("download", help="fetch missing apps from the server")
+    download.add_argument("--server", default=os.getenv("XI_SERVER", "http://www.strombackfamily.com:8080"))
+    download.add_argument("--chunks", type=int, default=4)
+
+    args = parser.parse_args(argv)
+    programs = args.programs or [os.path.join(os.path.dirname(os.path.abspath(__file__)), "programs"),
+                                 args.downloads]
+    state = StateDB(args.db)
+    try:
+        entries = load_entries(programs) if args.command in ("list", "install") else {}
+        handler = {"list": cmd_list, "install": cmd_install, "verify": cmd_verify, "download": cmd_download}
+        return handler[args.command](args, entries, state)
+    finally:
+        state.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
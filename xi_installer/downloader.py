@@ -0,0 +1,366 @@
+"""
+downloader.py
+
+HTTP download manager for XiInstaller.
+
+- Keep-alive connection pool shared by all requests (http.client, no extra dependencies)
+- Large files are split into Range requests fetched in parallel into a preallocated file
+- Progress is kept in a "<file>.part.json" sidecar so an interrupted download resumes
+- Finished files are checked against the catalog sha256 before they replace the target
+- A file that fails to download is reported and skipped; the rest of the sync goes on
+- Files already in the folder are compared by sha256; the hashes are cached by size and
+  mtime in ".downloads.json" so unchanged files aren't reread on every sync
+
+Remote catalog format (GET <server>/api/catalog.json):
+    {"apps": [{"name": "XiExplorer.exe", "url": "assets/downloads/XiExplorer.exe",
+               "size": 123, "sha256": "...", "version": "1.0"}]}
+"""
+
+import os
+import json
+import time
+import queue
+import hashlib
+import threading
+import http.client
+from urllib.parse import urlsplit, urljoin, quote
+from concurrent.futures import ThreadPoolExecutor
+
+CATALOG_PATH = "api/catalog.json"
+MIN_CHUNK = 4 * 1024 * 1024
+BUFFER_SIZE = 256 * 1024
+SAVE_EVERY = 4 * 1024 * 1024  # sidecar write interval per range, in bytes
+RETRIES = 5
+KNOWN_NAME = ".downloads.json"
+
+
+class DownloadError(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Keep-alive connections per (scheme, host, port), reused across threads."""
+
+    def __init__(self, max_per_host=8, timeout=30):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _new(self, scheme, netloc):
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(netloc, timeout=self.timeout)
+
+    def request(self, method, url, headers=None):
+        """Send a request and return (connection, response). Call release() when the body is read."""
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        # file names may hold spaces or non-ASCII; escapes already in the URL are kept
+        path = quote(parts.path or "/", safe="/%:@!$&'()*+,;=")
+        if parts.query:
+            path += "?" + parts.query
+        with self._lock:
+            idle = self._idle.setdefault(key, queue.LifoQueue())
+        try:
+            conn = idle.get_nowait()
+            reused = True
+        except queue.Empty:
+            conn = self._new(*key)
+            reused = False
+        try:
+            conn.request(method, path, headers=headers or {})
+            return key, conn, conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            if not reused:
+                raise
+            # the server dropped an idle keep-alive connection: retry once on a fresh one
+            conn = self._new(*key)
+            conn.request(method, path, headers=headers or {})
+            return key, conn, conn.getresponse()
+
+    def release(self, key, conn, response):
+        if response.will_close or not response.isclosed():
+            conn.close()
+            return
+        idle = self._idle[key]
+        if idle.qsize() < self.max_per_host:
+            idle.put(conn)
+        else:
+            conn.close()
+
+    def discard(self, conn):
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                while not idle.empty():
+                    idle.get_nowait().close()
+            self._idle.clear()
+
+    def get(self, url, headers=None):
+        key, conn, resp = self.request("GET", url, headers)
+        try:
+            body = resp.read()
+        except BaseException:
+            self.discard(conn)
+            raise
+        self.release(key, conn, resp)
+        if resp.status >= 400:
+            raise DownloadError(f"GET {url}: HTTP {resp.status}")
+        return body
+
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def fetch_catalog(pool, server_url):
+    """Download the server catalog, with app URLs made absolute."""
+    url = urljoin(server_url.rstrip("/") + "/", CATALOG_PATH)
+    apps = json.loads(pool.get(url).decode("utf-8"))["apps"]
+    for app in apps:
+        app["url"] = urljoin(url, app["url"])
+    return apps
+
+
+# ---------------- Download ----------------
+class Download:
+    """One file fetched in parallel Range chunks, resumable through a sidecar file."""
+
+    def __init__(self, pool, url, dest, sha256=None, chunks=4, on_progress=None, cancel_event=None):
+        self.pool = pool
+        self.url = url
+        self.dest = dest
+        self.sha256 = sha256.lower() if sha256 else None
+        self.chunks = max(1, chunks)
+        self.on_progress = on_progress
+        self.cancel_event = cancel_event or threading.Event()
+        self.part_path = dest + ".part"
+        self.state_path = self.part_path + ".json"
+        self._lock = threading.Lock()
+        self.state = None
+
+    # ---- sidecar ----
+    def _save_state(self):
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _load_state(self, size, etag):
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("url") != self.url or state.get("size") != size or state.get("etag") != etag:
+            return None
+        if not os.path.exists(self.part_path) or os.path.getsize(self.part_path) != size:
+            return None
+        return state
+
+    def _probe(self):
+        """-> (size, etag, accepts_ranges)"""
+        key, conn, resp = self.pool.request("HEAD", self.url)
+        resp.read()
+        self.pool.release(key, conn, resp)
+        if resp.status >= 400:
+            raise DownloadError(f"HEAD {self.url}: HTTP {resp.status}")
+        size = int(resp.getheader("Content-Length", "-1"))
+        return size, resp.getheader("ETag"), resp.getheader("Accept-Ranges", "").lower() == "bytes"
+
+    def _plan(self, size, ranged):
+        if size == 0:
+            return [[0, 0, 0]]
+        count = self.chunks if ranged and size >= 2 * MIN_CHUNK else 1
+        count = min(count, max(1, size // MIN_CHUNK))
+        step = -(-size // count)
+        return [[start, min(start + step, size), 0] for start in range(0, size, step)]
+
+    def _preallocate(self, size):
+        with open(self.part_path, "wb") as f:
+            if size and hasattr(os, "posix_fallocate"):
+                try:
+                    os.posix_fallocate(f.fileno(), 0, size)
+                    return
+                except OSError:
+                    pass
+            f.truncate(size)
+
+    # ---- workers ----
+    def _fetch_range(self, index, ranged):
+        start, end, _ = self.state["ranges"][index]
+        attempt = 0
+        while True:
+            done = self.state["ranges"][index][2]
+            if start + done >= end:
+                return
+            if self.cancel_event.is_set():
+                raise DownloadError("cancelled")
+            headers = {"Range": f"bytes={start + done}-{end - 1}"} if ranged else {}
+            if not ranged and done:
+                # no ranges: start over
+                self.state["ranges"][index][2] = done = 0
+            conn = None
+            try:
+                key, conn, resp = self.pool.request("GET", self.url, headers)
+                if resp.status not in (200, 206) or (ranged and resp.status != 206):
+                    raise DownloadError(f"GET {self.url}: HTTP {resp.status}")
+                unsaved = 0
+                with open(self.part_path, "r+b") as f:
+                    f.seek(start + done)
+                    while start + done < end:
+                        if self.cancel_event.is_set():
+                            raise DownloadError("cancelled")
+                        data = resp.read(min(BUFFER_SIZE, end - start - done))
+                        if not data:
+                            raise ConnectionError("connection closed early")
+                        f.write(data)
+                        done += len(data)
+                        unsaved += len(data)
+                        with self._lock:
+                            self.state["ranges"][index][2] = done
+                            if unsaved >= SAVE_EVERY:
+                                f.flush()
+                                self._save_state()
+                                unsaved = 0
+                        if self.on_progress:
+                            self.on_progress(self.bytes_done, self.state["size"])
+                with self._lock:
+                    self._save_state()
+                self.pool.release(key, conn, resp)
+                return
+            except (ConnectionError, OSError, http.client.HTTPException) as e:
+                if conn is not None:
+                    self.pool.discard(conn)
+                with self._lock:
+                    self._save_state()
+                attempt += 1
+                if attempt > RETRIES:
+                    raise DownloadError(f"{self.url}: {e}")
+                time.sleep(min(2 ** attempt * 0.1, 5))
+            except BaseException:
+                if conn is not None:
+                    self.pool.discard(conn)
+                with self._lock:
+                    self._save_state()
+                raise
+
+    @property
+    def bytes_done(self):
+        return sum(r[2] for r in self.state["ranges"])
+
+    def run(self):
+        size, etag, ranged = self._probe()
+        if size < 0:
+            raise DownloadError(f"{self.url}: server did not send a Content-Length")
+        self.state = self._load_state(size, etag)
+        if self.state is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.dest)), exist_ok=True)
+            self._preallocate(size)
+            self.state = {"url": self.url, "size": size, "etag": etag, "ranges": self._plan(size, ranged)}
+            self._save_state()
+        with ThreadPoolExecutor(max_workers=len(self.state["ranges"])) as pool:
+            for _ in pool.map(lambda i: self._fetch_range(i, ranged), range(len(self.state["ranges"]))):
+                pass
+        if self.sha256:
+            if sha256_file(self.part_path) != self.sha256:
+                os.remove(self.part_path)
+                os.remove(self.state_path)
+                raise DownloadError(f"{self.url}: checksum mismatch")
+        os.replace(self.part_path, self.dest)
+        os.remove(self.state_path)
+        return self.dest
+
+
+def download(pool, url, dest, sha256=None, chunks=4, on_progress=None, cancel_event=None):
+    return Download(pool, url, dest, sha256, chunks, on_progress, cancel_event).run()
+
+
+def _load_known(dest_dir):
+    try:
+        with open(os.path.join(dest_dir, KNOWN_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_known(dest_dir, known):
+    os.makedirs(dest_dir, exist_ok=True)
+    path = os.path.join(dest_dir, KNOWN_NAME)
+    with open(path + ".tmp", "w") as f:
+        json.dump(known, f)
+    os.replace(path + ".tmp", path)
+
+
+def _local_sha256(dest, known):
+    """sha256 of dest, or None if it doesn't exist. Rehashed only when size/mtime changed."""
+    try:
+        st = os.stat(dest)
+    except OSError:
+        return None
+    name = os.path.basename(dest)
+    rec = known.get(name)
+    if not rec or rec["size"] != st.st_size or rec["mtime"] != st.st_mtime_ns:
+        rec = known[name] = {"size": st.st_size, "mtime": st.st_mtime_ns, "sha256": sha256_file(dest)}
+    return rec["sha256"]
+
+
+def _up_to_date(dest, app, known):
+    if not os.path.exists(dest) or os.path.getsize(dest) != app.get("size"):
+        return False
+    if not app.get("sha256"):
+        return True  # nothing better to go by than the size
+    return _local_sha256(dest, known) == app["sha256"].lower()
+
+
+def sync_catalog(server_url, dest_dir, chunks=4, max_parallel=2, on_progress=None, cancel_event=None, pool=None,
+                 on_error=None):
+    """Download every app from the server catalog that is missing or stale in dest_dir.
+
+    Returns the list of downloaded paths. on_progress(name, done, total) is per file.
+    An app that fails is skipped and reported through on_error(name, exception);
+    only a failed catalog fetch or a cancel aborts the whole sync.
+    """
+    own_pool = pool is None
+    pool = pool or ConnectionPool()
+    known = _load_known(dest_dir)
+    try:
+        apps = fetch_catalog(pool, server_url)
+        todo = []
+        for app in apps:
+            dest = os.path.join(dest_dir, os.path.basename(app["name"]))
+            if not _up_to_date(dest, app, known):
+                todo.append((app, dest))
+
+        def fetch(item):
+            app, dest = item
+            progress = (lambda done, total: on_progress(app["name"], done, total)) if on_progress else None
+            try:
+                path = download(pool, app["url"], dest, app.get("sha256"), chunks, progress, cancel_event)
+            except Exception as e:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise
+                if on_error:
+                    on_error(app["name"], e)
+                return None
+            if app.get("sha256"):
+                st = os.stat(path)
+                known[os.path.basename(path)] = {"size": st.st_size, "mtime": st.st_mtime_ns,
+                                                 "sha256": app["sha256"].lower()}
+            return path
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as workers:
+                return [path for path in workers.map(fetch, todo) if path]
+        finally:
+            _save_known(dest_dir, known)
+    finally:
+        if own_pool:
+            pool.close()
@@ -0,0 +1,171 @@
+"""
+fake_server.py
+
+Local stand-in for the download server, built on http.server, for trying the
+downloader without the real site. Serves a folder with HEAD, Range and keep-alive,
+generates /api/catalog.json from it, and can inject latency, a per-connection bandwidth
+cap and dropped connections.
+
+Run:
+python fake_server.py programs/ --port 8765 --latency 0.05 --drop 0.1 --rate 5000000
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from urllib.parse import quote, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from downloader import CATALOG_PATH
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, folder, port=0, latency=0.0, drop=0.0, rate=0, seed=None):
+        super().__init__(("127.0.0.1", port), FakeHandler)
+        self.folder = os.path.abspath(folder)
+        self.latency = latency
+        self.drop = drop
+        self.rate = rate
+        self.random = random.Random(seed)
+        self.hashes = {}
+        self.requests = 0
+        self.connections = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+    def handle_error(self, request, client_address):
+        # clients cancelling or dropping connections is expected here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def sha256(self, path):
+        st = os.stat(path)
+        key = (path, st.st_size, st.st_mtime_ns)
+        if key not in self.hashes:
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(chunk)
+            self.hashes[key] = h.hexdigest()
+        return self.hashes[key]
+
+    def catalog(self):
+        apps = []
+        for name in sorted(os.listdir(self.folder)):
+            path = os.path.join(self.folder, name)
+            if os.path.isfile(path) and name.endswith((".exe", ".xipkg")):
+                apps.append({"name": name, "url": "/files/" + quote(name),
+                             "size": os.path.getsize(path), "sha256": self.sha256(path)})
+        return json.dumps({"apps": apps}).encode("utf-8")
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def do_HEAD(self):
+        self.handle_request(head=True)
+
+    def do_GET(self):
+        self.handle_request(head=False)
+
+    def handle_request(self, head):
+        self.server.requests += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.path == "/" + CATALOG_PATH:
+            body = self.server.catalog()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if not head:
+                self.wfile.write(body)
+            return
+        name = os.path.basename(unquote(self.path))
+        path = os.path.join(self.server.folder, name)
+        if not self.path.startswith("/files/") or not os.path.isfile(path):
+            self.send_error(404)
+            return
+
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        status = 200
+        rng = self.headers.get("Range")
+        if rng and rng.startswith("bytes="):
+            first, _, last = rng[6:].partition("-")
+            start = int(first)
+            end = int(last) if last else size - 1
+            status = 206
+        length = end - start + 1
+        self.send_response(status)
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", f'"{self.server.sha256(path)[:16]}"')
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if head:
+            return
+
+        drop_at = None
+        if self.server.drop and self.server.random.random() < self.server.drop:
+            drop_at = self.server.random.randint(0, max(0, length - 1))
+        with open(path, "rb") as f:
+            f.seek(start)
+            sent = 0
+            while sent < length:
+                chunk = f.read(min(64 * 1024, length - sent))
+                if drop_at is not None and sent + len(chunk) > drop_at:
+                    self.wfile.write(chunk[:drop_at - sent])
+                    self.close_connection = True
+                    return
+                self.wfile.write(chunk)
+                sent += len(chunk)
+                if self.server.rate:
+                    time.sleep(len(chunk) / self.server.rate)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("folder")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--drop", type=float, default=0.0, help="chance a response is cut off mid-body")
+    parser.add_argument("--rate", type=int, default=0, help="bytes/s per connection, 0 = unlimited")
+    args = parser.parse_args()
+    server = FakeServer(args.folder, args.port, args.latency, args.drop, args.rate)
+    print(f"serving {server.folder} on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
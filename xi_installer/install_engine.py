@@ -0,0 +1,342 @@
+"""
+install_engine.py
+
+Qt-free install engine used by XiInstaller.
+
+- Streams each program in chunks and hashes it (SHA-256) while copying
+- Writes to a temporary name next to the target, then swaps it in with os.replace
+- Installs a batch of apps concurrently on a thread pool
+- Reports progress through a callback, supports cancel and rolls a batch back
+
+Shortcut creation is a pluggable hook so the engine runs on any platform.
+With a PackageStore the engine materializes installs from the store (reflink, else copy)
+and builds upgraded objects from block deltas instead of reading whole new files.
+.xipkg packages are extracted into a staging folder that replaces the app folder.
+"""
+
+import os
+import json
+import stat
+import hashlib
+import shutil
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+
+import xipkg
+
+CHUNK_SIZE = 1024 * 1024
+MANIFEST_NAME = "manifest.json"
+
+
+class InstallError(Exception):
+    pass
+
+
+class ChecksumMismatch(InstallError):
+    pass
+
+
+class InstallCancelled(InstallError):
+    pass
+
+
+def load_manifest(programs_dir):
+    """Read programs/manifest.json -> {app_name: {"sha256", "version", "depends"}}. All keys optional."""
+    path = os.path.join(programs_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except PermissionError:
+        # read-only files (e.g. installs that older versions hardlinked to store objects):
+        # Windows refuses to delete those
+        os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+        os.remove(path)
+
+
+def _carry_over(old_dir, new_dir, package_files):
+    """Move files the package doesn't ship (settings, saves, logs) from the replaced app
+    folder into the new one. Returns False if any of them could not be moved."""
+    moved_all = True
+    for folder, _dirs, names in os.walk(old_dir):
+        for name in names:
+            path = os.path.join(folder, name)
+            rel = os.path.relpath(path, old_dir)
+            target = os.path.join(new_dir, rel)
+            if rel.replace(os.sep, "/") in package_files or os.path.lexists(target):
+                continue
+            try:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(path, target)
+            except OSError:
+                moved_all = False
+    return moved_all
+
+
+def sha256_file(path, chunk_size=CHUNK_SIZE):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class InstallJob:
+    def __init__(self, app_name, src_path, install_folder, expected_sha256=None, delta_path=None):
+        self.app_name = app_name
+        self.src_path = src_path
+        self.target_dir = os.path.join(install_folder, os.path.splitext(app_name)[0])
+        self.expected_sha256 = expected_sha256  # published hash (manifest.json), not a scanned one
+        self.delta_path = delta_path
+        self.is_package = src_path.endswith(xipkg.PACKAGE_EXT)
+        if self.is_package:
+            manifest = xipkg.read_manifest(src_path)
+            self.target_path = os.path.join(self.target_dir, manifest["entry"])
+            self.size = sum(info["size"] for info in manifest["files"].values())
+            self.files = set(manifest["files"])
+        else:
+            self.target_path = os.path.join(self.target_dir, app_name)
+            self.size = os.path.getsize(src_path)
+
+
+class InstallResult:
+    def __init__(self, job, sha256=None, error=None):
+        self.job = job
+        self.sha256 = sha256
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class InstallEngine:
+    """Install one or many InstallJobs.
+
+    on_progress(app_name, done_bytes, total_bytes) and shortcut_hook(job) are called
+    from worker threads. io_slots (e.g. a shared threading.BoundedSemaphore) caps how
+    many file copies / package members are written at once across engines.
+    """
+
+    def __init__(self, max_workers=4, chunk_size=CHUNK_SIZE, on_progress=None, shortcut_hook=None,
+                 store=None, io_slots=None):
+        self.max_workers = max_workers
+        self.store = store
+        self.io_slots = io_slots or nullcontext()
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+        self.shortcut_hook = shortcut_hook
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._undo = []
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    # ---------------- Single install ----------------
+    def _copy(self, job, tmp_path):
+        h = hashlib.sha256()
+        done = 0
+        with self.io_slots, open(job.src_path, "rb") as src, open(tmp_path, "wb") as dst:
+            while True:
+                if self._cancel.is_set():
+                    raise InstallCancelled(f"{job.app_name}: cancelled")
+                chunk = src.read(self.chunk_size)
+                if not chunk:
+                    break
+                dst.write(chunk)
+                h.update(chunk)
+                done += len(chunk)
+                if self.on_progress:
+                    self.on_progress(job.app_name, done, job.size)
+            dst.flush()
+            os.fsync(dst.fileno())
+        return h.hexdigest()
+
+    def _stage(self, job, tmp_path):
+        """Produce the new file at tmp_path and return its sha256."""
+        if self.store is None:
+            digest = self._copy(job, tmp_path)
+            if job.expected_sha256 and digest != job.expected_sha256.lower():
+                raise ChecksumMismatch(f"{job.app_name}: expected {job.expected_sha256}, got {digest}")
+            return digest
+
+        expected = job.expected_sha256.lower() if job.expected_sha256 else None
+        if expected is None:
+            # nothing published to check against: the store may only be trusted for the
+            # bytes the source holds right now, so find out what those are
+            with self.io_slots:
+                expected = sha256_file(job.src_path, self.chunk_size)
+        digest = expected
+        if not self.store.has(digest) and job.delta_path:
+            try:
+                with self.io_slots:
+                    digest = self.store.add_delta(job.delta_path)
+            except (KeyError, ValueError):
+                pass  # base version not in the store or delta stale: fall back to a full copy
+        if digest == expected and self.store.has(digest):
+            if self.on_progress:
+                self.on_progress(job.app_name, job.size, job.size)
+        else:
+            obj_tmp = self.store.new_temp()
+            try:
+                digest = self._copy(job, obj_tmp)
+                if digest != expected:
+                    raise ChecksumMismatch(f"{job.app_name}: expected {expected}, got {digest}")
+            except BaseException:
+                os.remove(obj_tmp)
+                raise
+            self.store.commit_temp(obj_tmp, digest)
+        with self.io_slots:
+            self.store.materialize(digest, tmp_path)
+        return digest
+
+    def _install_package(self, job):
+        """Extract into a staging folder, then swap it in for the whole app folder.
+        Files the package doesn't ship are moved over from the old folder on commit()."""
+        if job.expected_sha256:
+            digest = sha256_file(job.src_path)
+            if digest != job.expected_sha256.lower():
+                raise ChecksumMismatch(f"{job.app_name}: expected {job.expected_sha256}, got {digest}")
+        parent = os.path.dirname(job.target_dir)
+        os.makedirs(parent, exist_ok=True)
+        staging = job.target_dir + f".part-{os.getpid()}-{threading.get_ident()}"
+        backup_path = None
+        try:
+            os.makedirs(staging)
+            manifest = xipkg.extract_package(
+                job.src_path, staging, max_workers=self.max_workers, chunk_size=self.chunk_size,
+                on_progress=(lambda done, total: self.on_progress(job.app_name, done, total))
+                if self.on_progress else None,
+                cancel_event=self._cancel, io_slots=self.io_slots)
+            if self._cancel.is_set():
+                raise InstallCancelled(f"{job.app_name}: cancelled")
+            if os.path.exists(job.target_dir):
+                backup_path = job.target_dir + ".old"
+                if os.path.exists(backup_path):
+                    shutil.rmtree(backup_path)
+                os.replace(job.target_dir, backup_path)
+            os.replace(staging, job.target_dir)
+        except BaseException as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            if backup_path and not os.path.exists(job.target_dir):
+                # the swap itself failed (e.g. a file in the folder is in use): put the old app back
+                os.replace(backup_path, job.target_dir)
+            if isinstance(e, xipkg.PackageError) and self._cancel.is_set():
+                raise InstallCancelled(f"{job.app_name}: cancelled")
+            raise
+        with self._lock:
+            self._undo.append((job, backup_path, False))
+        if self.shortcut_hook:
+            self.shortcut_hook(job)
+        # the entry was hashed while it was written
+        return manifest["files"][manifest["entry"]]["sha256"]
+
+    def install(self, job):
+        if job.is_package:
+            return self._install_package(job)
+        created_dir = not os.path.isdir(job.target_dir)
+        os.makedirs(job.target_dir, exist_ok=True)
+        tmp_path = job.target_path + f".part-{os.getpid()}-{threading.get_ident()}"
+        backup_path = None
+        try:
+            digest = self._stage(job, tmp_path)
+            if os.path.exists(job.target_path):
+                backup_path = job.target_path + ".old"
+                os.replace(job.target_path, backup_path)
+            os.replace(tmp_path, job.target_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                _remove(tmp_path)
+            if backup_path and not os.path.exists(job.target_path):
+                # the swap itself failed (e.g. the exe is running): put the old version back
+                os.replace(backup_path, job.target_path)
+            if created_dir and not os.listdir(job.target_dir):
+                os.rmdir(job.target_dir)
+            raise
+        with self._lock:
+            self._undo.append((job, backup_path, created_dir))
+        if self.shortcut_hook:
+            self.shortcut_hook(job)
+        return digest
+
+    # ---------------- Batch ----------------
+    def begin(self):
+        self._cancel.clear()
+        self._undo = []
+
+    def install_batch(self, jobs):
+        """Install jobs concurrently. On cancel every finished install of the batch is rolled back."""
+        self.begin()
+
+        def run(job):
+            try:
+                return InstallResult(job, sha256=self.install(job))
+            except Exception as e:
+                return InstallResult(job, error=e)
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            results = list(pool.map(run, jobs))
+
+        self.finish(results)
+        return results
+
+    def finish(self, results, keep_done=False):
+        """End a batch: roll everything back if it was cancelled, otherwise drop the backups.
+
+        keep_done: on cancel, keep the installs that completed and only roll back the rest.
+        """
+        if not self._cancel.is_set():
+            self.commit()
+        elif keep_done:
+            done = {r.job for r in results if r.ok}
+            self.rollback([job for job, _backup, _created in self._undo if job not in done])
+            self.commit()
+        else:
+            self.rollback()
+            for r in results:
+                if r.ok:
+                    r.sha256, r.error = None, InstallCancelled(f"{r.job.app_name}: rolled back")
+
+    def commit(self):
+        for job, backup_path, _created in self._undo:
+            if backup_path and os.path.exists(backup_path):
+                if job.is_package:
+                    # the swap replaced the whole folder; keep whatever the user put there
+                    if _carry_over(backup_path, job.target_dir, job.files):
+                        shutil.rmtree(backup_path)
+                else:
+                    _remove(backup_path)
+        self._undo = []
+
+    def rollback(self, jobs=None):
+        """Undo every install recorded since the batch started (or only those of jobs),
+        restoring replaced files."""
+        kept = []
+        for entry in reversed(self._undo):
+            job, backup_path, created_dir = entry
+            if jobs is not None and job not in jobs:
+                kept.append(entry)
+                continue
+            if job.is_package:
+                shutil.rmtree(job.target_dir, ignore_errors=True)
+                if backup_path:
+                    os.replace(backup_path, job.target_dir)
+                continue
+            if backup_path and os.path.exists(backup_path):
+                os.replace(backup_path, job.target_path)
+            elif os.path.exists(job.target_path):
+                _remove(job.target_path)
+            if created_dir and os.path.isdir(job.target_dir) and not os.listdir(job.target_dir):
+                os.rmdir(job.target_dir)
+        self._undo = kept[::-1]
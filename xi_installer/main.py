@@ -1,12 +1,23 @@
-import sys, os, shutil, json
+import sys, os, threading
+from collections import OrderedDict
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QListWidget, QPushButton, QLabel,
     QMessageBox, QHBoxLayout, QFileDialog, QDialog, QCheckBox, QDialogButtonBox,
-    QFormLayout, QLineEdit, QSizePolicy, QFrame
+    QFormLayout, QLineEdit, QSizePolicy, QFrame, QProgressDialog, QAbstractItemView, QInputDialog
 )
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont, QPixmap
-import win32com.client  # pip install pywin32
+from PyQt6.QtCore import Qt, QObject, QThread, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QFont, QPixmap, QImage
+
+from install_engine import InstallEngine, InstallJob
+from package_store import PackageStore
+from catalog import Catalog, PREVIEW_SIZE, preview_is_fresh
+from state_db import StateDB, LEGACY_JSON, OK, data_dir
+from downloader import sync_catalog
+from scheduler import Scheduler, DependencyError, resolve, prune_installed
+
+STORE_DIR = ".xistore"
+DEFAULT_SERVER = os.getenv("XI_SERVER", "http://www.strombackfamily.com:8080")
+PREVIEW_CACHE_SIZE = 64
 
 # ---------------- Resource path helper ----------------
 def resource_path(relative_path):
@@ -15,7 +26,7 @@ def resource_path(relative_path):
         # Running in PyInstaller bundle
         base_path = sys._MEIPASS
     else:
-        base_path = os.path.abspath(".")
+        base_path = os.path.dirname(os.path.abspath(__file__))
     return os.path.join(base_path, relative_path)
 
 # ---------------- Custom Install Dialog ----------------
@@ -63,6 +74,103 @@ class CustomInstallDialog(QDialog):
             "startmenu_shortcut": self.startmenu_shortcut.isChecked()
         }
 
+# ---------------- Install Worker ----------------
+class InstallWorker(QObject):
+    """Runs a dependency-ordered install batch off the GUI thread."""
+    progress = pyqtSignal("qint64", "qint64")  # done bytes, total bytes (whole batch)
+    finished = pyqtSignal(list)
+
+    def __init__(self, jobs, graph, store=None):
+        super().__init__()
+        self.jobs = jobs
+        self.graph = graph
+        self.total = sum(job.size for job in jobs.values())
+        self.done = {}
+        self.engine = InstallEngine(on_progress=self.on_progress, store=store)
+        self.scheduler = Scheduler(engine=self.engine)
+
+    def on_progress(self, app_name, done, total):
+        self.done[app_name] = done
+        self.progress.emit(sum(self.done.values()), self.total)
+
+    def cancel(self):
+        self.engine.cancel()
+
+    def run(self):
+        self.finished.emit(self.scheduler.run(self.jobs, self.graph))
+
+# ---------------- Download Worker ----------------
+class DownloadWorker(QObject):
+    """Fetches the server catalog and any missing apps off the GUI thread."""
+    progress = pyqtSignal(str, "qint64", "qint64")  # app name, done bytes, total bytes
+    finished = pyqtSignal(list, str)      # downloaded paths, error message
+
+    def __init__(self, server_url, dest_dir):
+        super().__init__()
+        self.server_url = server_url
+        self.dest_dir = dest_dir
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        failed = []
+        try:
+            paths = sync_catalog(self.server_url, self.dest_dir, on_progress=self.progress.emit,
+                                 cancel_event=self.cancel_event,
+                                 on_error=lambda name, e: failed.append(f"{name}: {e}"))
+            self.finished.emit(paths, "\n".join(failed))
+        except Exception as e:
+            self.finished.emit([], str(e))
+
+# ---------------- Verify Worker ----------------
+class VerifyWorker(QObject):
+    """Rehashes changed installs off the GUI thread."""
+    finished = pyqtSignal(dict, str)  # {app_name: status}, error message
+
+    def __init__(self, db_path):
+        super().__init__()
+        self.db_path = db_path
+
+    def run(self):
+        try:
+            # sqlite connections belong to the thread that opened them
+            state = StateDB(self.db_path)
+            try:
+                self.finished.emit(state.verify(), "")
+            finally:
+                state.close()
+        except Exception as e:
+            self.finished.emit({}, str(e))
+
+# ---------------- Preview Loader ----------------
+class PreviewSignals(QObject):
+    loaded = pyqtSignal(str, QImage)
+
+
+class PreviewLoader(QRunnable):
+    """Loads (and on first use pre-scales and caches) an app preview off the GUI thread."""
+
+    def __init__(self, app_name, entry, signals):
+        super().__init__()
+        self.app_name = app_name
+        self.entry = entry
+        self.signals = signals
+
+    def run(self):
+        if preview_is_fresh(self.entry):
+            image = QImage(self.entry["preview"])
+        else:
+            image = QImage(self.entry["preview_src"]).scaled(
+                PREVIEW_SIZE, PREVIEW_SIZE, Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation)
+            os.makedirs(os.path.dirname(self.entry["preview"]), exist_ok=True)
+            tmp_path = self.entry["preview"] + ".tmp.png"
+            if image.save(tmp_path):
+                os.replace(tmp_path, self.entry["preview"])
+        self.signals.loaded.emit(self.app_name, image)
+
 # ---------------- Xi Installer ----------------
 class XiInstaller(QWidget):
     def __init__(self):
@@ -81,6 +189,7 @@ class XiInstaller(QWidget):
         self.list.setFont(QFont("Arial", 14))
         self.list.setSpacing(5)
         self.list.setMinimumWidth(400)
+        self.list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         left_panel.addWidget(title)
         left_panel.addWidget(self.list)
         layout.addLayout(left_panel)
@@ -105,50 +214,116 @@ class XiInstaller(QWidget):
         self.detail_text.setWordWrap(True)
         self.detail_text.setFont(QFont("Arial", 14))
 
-        self.install_btn = QPushButton("Install Selected App")
+        self.install_btn = QPushButton("Install Selected Apps")
         self.install_btn.setFont(QFont("Arial", 16))
         self.install_btn.setMinimumHeight(50)
         self.install_btn.setEnabled(False)
 
+        self.verify_btn = QPushButton("Verify Installs")
+        self.verify_btn.setFont(QFont("Arial", 12))
+        self.download_btn = QPushButton("Download Apps...")
+        self.download_btn.setFont(QFont("Arial", 12))
+
         right_panel.addWidget(self.detail_title)
         right_panel.addWidget(self.preview_frame)
         right_panel.addWidget(self.detail_text)
         right_panel.addStretch()
+        right_panel.addWidget(self.download_btn)
+        right_panel.addWidget(self.verify_btn)
         right_panel.addWidget(self.install_btn)
         layout.addLayout(right_panel)
 
         # Load apps
         self.programs_dir = resource_path("programs")
+        # apps fetched from the server live in the user data folder, next to the bundled ones
+        self.downloads_dir = os.path.join(data_dir(), "programs")
+        self.catalogs = [Catalog(self.programs_dir), Catalog(self.downloads_dir)]
+        self.entries = {}
         self.apps = self.scan_programs()
-        for app in self.apps:
-            self.list.addItem(app)
+        self.list.addItems(list(self.apps))
+
+        # Previews: decoded on a worker thread, kept in a small LRU of pixmaps
+        self.preview_cache = OrderedDict()
+        self.preview_pending = set()
+        self.preview_signals = PreviewSignals()
+        self.preview_signals.loaded.connect(self.on_preview_loaded)
 
-        self.installed_file = "installed.json"
+        self.state = StateDB()
         self.installed = self.load_installed()
 
         self.list.itemSelectionChanged.connect(self.show_details)
         self.install_btn.clicked.connect(self.install_app)
+        self.verify_btn.clicked.connect(self.verify_installs)
+        self.download_btn.clicked.connect(self.download_apps)
 
-    # Scan embedded programs
+    # Scan embedded programs (cached, rebuilt only when programs/ changes)
     def scan_programs(self):
-        apps = {}
-        if not os.path.exists(self.programs_dir):
-            os.makedirs(self.programs_dir)
-        for file in os.listdir(self.programs_dir):
-            if file.endswith(".exe"):
-                path = os.path.join(self.programs_dir, file)
-                apps[file] = path
-        return apps
+        self.entries = {}
+        for catalog in self.catalogs:
+            self.entries.update(catalog.load())
+        return {name: entry["path"] for name, entry in sorted(self.entries.items())}
 
     def load_installed(self):
-        if os.path.exists(self.installed_file):
-            with open(self.installed_file, "r") as f:
-                return json.load(f)
-        return {}
-
-    def save_installed(self):
-        with open(self.installed_file, "w") as f:
-            json.dump(self.installed, f, indent=4)
+        # older versions kept installed.json in the working directory
+        self.state.migrate_json(LEGACY_JSON)
+        return self.state.paths()
+
+    def download_apps(self):
+        server_url, ok = QInputDialog.getText(self, "Download Apps", "Server:", text=DEFAULT_SERVER)
+        if not ok or not server_url:
+            return
+        self.download_dialog = QProgressDialog("Fetching catalog...", "Cancel", 0, 1000, self)
+        self.download_dialog.setWindowTitle("Xi Installer")
+        self.download_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.download_dialog.setMinimumDuration(0)
+
+        self.download_thread = QThread()
+        self.download_worker = DownloadWorker(server_url, self.downloads_dir)
+        self.download_worker.moveToThread(self.download_thread)
+        self.download_thread.started.connect(self.download_worker.run)
+        self.download_worker.progress.connect(self.on_download_progress)
+        self.download_worker.finished.connect(self.on_download_finished)
+        self.download_worker.finished.connect(self.download_thread.quit)
+        self.download_dialog.canceled.connect(self.download_worker.cancel, Qt.ConnectionType.DirectConnection)
+        self.download_btn.setEnabled(False)
+        self.download_thread.start()
+
+    def on_download_progress(self, app_name, done, total):
+        self.download_dialog.setLabelText(f"Downloading {app_name}...")
+        self.download_dialog.setValue(int(done * 1000 / total) if total else 1000)
+
+    def on_download_finished(self, paths, error):
+        self.download_dialog.reset()
+        self.download_btn.setEnabled(True)
+        if paths:
+            self.apps = self.scan_programs()
+            self.list.clear()
+            self.list.addItems(list(self.apps))
+        if error:
+            QMessageBox.warning(self, "Download Apps", f"Download failed:\n{error}")
+        if paths or not error:
+            QMessageBox.information(self, "Download Apps", f"{len(paths)} app(s) downloaded.")
+
+    def verify_installs(self):
+        self.verify_thread = QThread()
+        self.verify_worker = VerifyWorker(self.state.path)
+        self.verify_worker.moveToThread(self.verify_thread)
+        self.verify_thread.started.connect(self.verify_worker.run)
+        self.verify_worker.finished.connect(self.on_verify_finished)
+        self.verify_worker.finished.connect(self.verify_thread.quit)
+        self.verify_btn.setEnabled(False)
+        self.verify_thread.start()
+
+    def on_verify_finished(self, status, error):
+        self.verify_btn.setEnabled(True)
+        if error:
+            QMessageBox.warning(self, "Verify Installs", f"Verify failed: {error}")
+            return
+        problems = [f"{name}: {s}" for name, s in status.items() if s != OK]
+        if problems:
+            QMessageBox.warning(self, "Verify Installs", "\n".join(problems))
+        else:
+            QMessageBox.information(self, "Verify Installs", f"All {len(status)} installed apps are intact.")
 
     def show_details(self):
         app_name = self.list.currentItem().text()
@@ -157,42 +332,128 @@ class XiInstaller(QWidget):
         self.detail_text.setText(f"Status: {status}\n\nLocation: {self.installed.get(app_name, 'Not installed yet')}")
         self.install_btn.setEnabled(True)
 
-        preview_image_path = resource_path(os.path.join("programs", app_name.replace(".exe", ".png")))
-        if os.path.exists(preview_image_path):
-            pixmap = QPixmap(preview_image_path).scaled(300, 300, Qt.AspectRatioMode.KeepAspectRatio)
+        entry = self.entries[app_name]
+        if entry.get("version"):
+            self.detail_text.setText(self.detail_text.text() + f"\n\nVersion: {entry['version']}")
+        self.show_preview(app_name)
+
+    def show_preview(self, app_name):
+        entry = self.entries[app_name]
+        if not entry["preview_src"]:
+            self.preview_label.setText("App Preview")
+            return
+        pixmap = self.preview_cache.get(app_name)
+        if pixmap is not None:
+            self.preview_cache.move_to_end(app_name)
             self.preview_label.setPixmap(pixmap)
+            return
+        self.preview_label.setText("Loading preview...")
+        if app_name not in self.preview_pending:
+            self.preview_pending.add(app_name)
+            QThreadPool.globalInstance().start(PreviewLoader(app_name, entry, self.preview_signals))
+
+    def on_preview_loaded(self, app_name, image):
+        self.preview_pending.discard(app_name)
+        if image.isNull():
+            pixmap = None
         else:
-            self.preview_label.setText("App Preview")
+            pixmap = QPixmap.fromImage(image)
+            self.preview_cache[app_name] = pixmap
+            if len(self.preview_cache) > PREVIEW_CACHE_SIZE:
+                self.preview_cache.popitem(last=False)
+        item = self.list.currentItem()
+        if item and item.text() == app_name:
+            if pixmap is None:
+                self.preview_label.setText("App Preview")
+            else:
+                self.preview_label.setPixmap(pixmap)
 
     def install_app(self):
-        app_name = self.list.currentItem().text()
-        src_path = self.apps[app_name]
-
-        dialog = CustomInstallDialog(app_name, self)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            options = dialog.get_options()
-            target_dir = os.path.join(options["install_folder"], app_name.replace(".exe", ""))
-            target_path = os.path.join(target_dir, app_name)
+        app_names = [item.text() for item in self.list.selectedItems()]
+        if not app_names:
+            return
+
+        dialog = CustomInstallDialog(", ".join(app_names), self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        self.install_options = dialog.get_options()
+
+        # pull in dependencies that aren't installed yet; shared ones are installed once
+        try:
+            graph = resolve(app_names, lambda name: self.entries[name]["depends"])
+        except DependencyError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        graph = prune_installed(graph, self.installed, set(app_names))
+
+        install_folder = self.install_options["install_folder"]
+        jobs = {
+            name: InstallJob(name, self.apps[name], install_folder,
+                             self.entries[name]["manifest_sha256"], self.find_delta(name))
+            for name in graph
+        }
+        # keep the store on the install drive so installs can be reflinks of its objects
+        self.install_store = store = PackageStore(os.path.join(install_folder, STORE_DIR))
+
+        self.progress_dialog = QProgressDialog("Installing...", "Cancel", 0, 1000, self)
+        self.progress_dialog.setWindowTitle("Xi Installer")
+        self.progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.progress_dialog.setMinimumDuration(0)
+
+        self.install_thread = QThread()
+        self.install_worker = InstallWorker(jobs, graph, store)
+        self.install_worker.moveToThread(self.install_thread)
+        self.install_thread.started.connect(self.install_worker.run)
+        self.install_worker.progress.connect(self.on_install_progress)
+        self.install_worker.finished.connect(self.on_install_finished)
+        self.install_worker.finished.connect(self.install_thread.quit)
+        # direct call: the worker thread is busy in the scheduler, the event is thread-safe
+        self.progress_dialog.canceled.connect(self.install_worker.cancel, Qt.ConnectionType.DirectConnection)
+        self.install_btn.setEnabled(False)
+        self.install_thread.start()
 
-            try:
-                os.makedirs(target_dir, exist_ok=True)
-                shutil.copy(src_path, target_path)
+    def find_delta(self, app_name):
+        """programs/<App>.xidelta upgrades the previous version already in the store."""
+        path = os.path.join(os.path.dirname(self.apps[app_name]), os.path.splitext(app_name)[0] + ".xidelta")
+        return path if os.path.exists(path) else None
 
-                self.installed[app_name] = target_path
-                self.save_installed()
+    def on_install_progress(self, done, total):
+        self.progress_dialog.setValue(int(done * 1000 / total) if total else 1000)
 
+    def on_install_finished(self, results):
+        self.progress_dialog.reset()
+        self.install_btn.setEnabled(True)
+        options = self.install_options
+
+        errors = []
+        for result in results:
+            job = result.job
+            if not result.ok:
+                errors.append(f"{job.app_name}: {result.error}")
+                continue
+            try:
                 if options["desktop_shortcut"]:
                     desktop = os.path.join(os.path.expanduser("~"), "Desktop")
-                    self.create_shortcut(target_path, os.path.join(desktop, app_name))
-
+                    self.create_shortcut(job.target_path, os.path.join(desktop, os.path.basename(job.target_path)))
                 if options["startmenu_shortcut"]:
-                    self.create_start_menu_shortcut(target_path, app_name.replace(".exe", ""))
-
-                QMessageBox.information(self, "Success", f"{app_name} installed to {target_dir}")
+                    self.create_start_menu_shortcut(job.target_path, os.path.splitext(job.app_name)[0])
             except Exception as e:
-                QMessageBox.warning(self, "Error", f"Failed to install {app_name}: {e}")
+                errors.append(f"{job.app_name}: shortcut failed: {e}")
+        self.state.record_installs([(r.job.app_name, r.job.target_path, r.sha256) for r in results if r.ok])
+        self.installed = self.state.paths()
+        # objects of replaced versions that no install uses any more
+        self.install_store.gc(self.state.hashes())
+
+        installed = [r.job.app_name for r in results if r.ok]
+        if installed:
+            QMessageBox.information(self, "Success", f"Installed to {options['install_folder']}:\n" + "\n".join(installed))
+        if errors:
+            QMessageBox.warning(self, "Error", "Failed to install:\n" + "\n".join(errors))
+        if self.list.currentItem():
+            self.show_details()
 
     def create_shortcut(self, target, shortcut_path):
+        import win32com.client  # pip install pywin32; slow to import, only needed here
         shell = win32com.client.Dispatch("WScript.Shell")
         shortcut = shell.CreateShortcut(shortcut_path + ".lnk")
         shortcut.TargetPath = target
@@ -200,6 +461,7 @@ class XiInstaller(QWidget):
         shortcut.save()
 
     def create_start_menu_shortcut(self, target, app_name):
+        import win32com.client
         shell = win32com.client.Dispatch("WScript.Shell")
         start_menu = os.path.join(os.getenv("APPDATA"), "Microsoft\\Windows\\Start Menu\\Programs")
         shortcut_path = os.path.join(start_menu, app_name + ".lnk")
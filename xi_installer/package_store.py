@@ -0,0 +1,358 @@
+"""
+package_store.py
+
+Content-addressed package store for XiInstaller.
+
+- Objects are kept once under <install_folder>/.xistore/objects/<sha[:2]>/<sha256>
+- Installs are materialized from the store as reflinks or, where the filesystem can't
+  clone (ext4, NTFS), as plain copies; they never share an inode with the object, so
+  editing an installed file can't change what the store hands out next time
+- Upgrades are rsync-style block deltas: the new object is built from the old one and
+  the delta, so programs/ only has to ship the changed bytes. On reflink-capable
+  filesystems (btrfs, xfs) the object and the install also share the unchanged extents;
+  elsewhere both are full-size files and an upgrade writes as much as a plain copy
+
+Delta file layout (big endian):
+    b"XIDELTA1" | base sha256 (32) | new sha256 (32) | new size (Q) | block size (I)
+    then records: b"C" old_offset (Q) length (Q)  or  b"D" length (Q) data
+"""
+
+import os
+import sys
+import stat
+import shutil
+import struct
+import hashlib
+import tempfile
+import itertools
+
+from install_engine import sha256_file
+
+DELTA_MAGIC = b"XIDELTA1"
+DELTA_HEADER = struct.Struct(">32s32sQI")
+COPY_RECORD = struct.Struct(">QQ")
+DATA_RECORD = struct.Struct(">Q")
+BLOCK_SIZE = 16 * 1024
+ROLL_MOD = 1 << 16
+# a byte-by-byte resync scans at most one block; after each miss the next scan starts
+# further ahead (doubling up to MAX_SKIP blocks) so rewritten files stay cheap to diff
+MAX_SKIP = 64
+
+FICLONE = 0x40049409  # linux/fs.h
+
+
+def reflink(src, dst):
+    """Clone src to dst sharing extents. Returns False when the filesystem can't."""
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+        return True
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+
+# ---------------- Rolling checksum ----------------
+def weak_checksum(block):
+    """rsync weak checksum of a block -> (a, b)."""
+    a = sum(block) % ROLL_MOD
+    # sum((len - i) * x_i) == sum of the running prefix sums
+    b = sum(itertools.accumulate(block)) % ROLL_MOD
+    return a, b
+
+
+def roll(a, b, out_byte, in_byte, length):
+    a = (a - out_byte + in_byte) % ROLL_MOD
+    b = (b - length * out_byte + a) % ROLL_MOD
+    return a, b
+
+
+def strong_checksum(block):
+    return hashlib.blake2b(block, digest_size=16).digest()
+
+
+class Signature:
+    """Block hashes of an old file, used to build a delta against it.
+
+    The weak (rolling) index is only built the first time shifted data has to be
+    searched, so files with in-place edits never pay for it.
+    """
+
+    def __init__(self, path, block_size=BLOCK_SIZE):
+        self.path = path
+        self.block_size = block_size
+        self.strong = []  # by block index
+        self._weak = None  # (a << 16 | b) -> [block index, ...]
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                self.strong.append(strong_checksum(block))
+
+    @property
+    def weak(self):
+        if self._weak is None:
+            self._weak = {}
+            with open(self.path, "rb") as f:
+                for index, block in enumerate(iter(lambda: f.read(self.block_size), b"")):
+                    if len(block) == self.block_size:
+                        a, b = weak_checksum(block)
+                        self._weak.setdefault(a << 16 | b, []).append(index)
+        return self._weak
+
+    def match(self, key, block):
+        candidates = self.weak.get(key)
+        if not candidates:
+            return None
+        digest = strong_checksum(block)
+        for index in candidates:
+            if self.strong[index] == digest:
+                return index
+        return None
+
+
+# ---------------- Delta ----------------
+def make_delta(old_path, new_path, delta_path, block_size=BLOCK_SIZE):
+    """Write a delta turning old_path into new_path. Returns the delta size in bytes."""
+    sig = Signature(old_path, block_size)
+    with open(new_path, "rb") as f:
+        data = f.read()
+    n = len(data)
+    ops = []
+    literal_start = 0
+
+    def flush_literal(end):
+        if end > literal_start:
+            ops.append(("D", literal_start, end))
+
+    def add_copy(index):
+        offset = index * block_size
+        length = min(block_size, n - pos)
+        if ops and ops[-1][0] == "C" and ops[-1][1] + ops[-1][2] == offset:
+            ops[-1] = ("C", ops[-1][1], ops[-1][2] + length)
+        else:
+            ops.append(("C", offset, length))
+
+    pos = 0
+    expect = 0  # block we expect next: follows the last match, so shifted runs stay fast
+    skip = 1
+    while pos < n:
+        # fast path: the expected block, or the block at the same offset (in-place edits)
+        block = data[pos:pos + block_size]
+        digest = None
+        for index in (expect, pos // block_size if pos % block_size == 0 else -1):
+            if 0 <= index < len(sig.strong):
+                digest = digest or strong_checksum(block)
+                if digest == sig.strong[index]:
+                    break
+        else:
+            index = None
+        if index is not None:
+            flush_literal(pos)
+            add_copy(index)
+            pos += block_size
+            literal_start = pos
+            expect = index + 1
+            skip = 1
+            continue
+        if pos + block_size > n:
+            pos = n
+            break
+        # in-place edit: the data lines up again on the next block
+        nxt = pos // block_size + 1
+        if pos % block_size == 0 and nxt < len(sig.strong) and \
+                strong_checksum(data[nxt * block_size:(nxt + 1) * block_size]) == sig.strong[nxt]:
+            pos = nxt * block_size
+            expect = nxt
+            continue
+        # slow path: roll byte by byte looking for any known block (shifted data)
+        a, b = weak_checksum(data[pos:pos + block_size])
+        scan_end = min(n - block_size, pos + block_size)
+        matched = None
+        while True:
+            matched = sig.match(a << 16 | b, data[pos:pos + block_size])
+            if matched is not None or pos >= scan_end:
+                break
+            a, b = roll(a, b, data[pos], data[pos + block_size], block_size)
+            pos += 1
+        if matched is None:
+            # leave the rest as literal data and retry further ahead on a block boundary
+            pos = (pos // block_size + skip) * block_size
+            skip = min(skip * 2, MAX_SKIP)
+            continue
+        flush_literal(pos)
+        add_copy(matched)
+        pos += block_size
+        literal_start = pos
+        expect = matched + 1
+        skip = 1
+    flush_literal(n)
+
+    base_sha = bytes.fromhex(sha256_file(old_path))
+    new_sha = hashlib.sha256(data).digest()
+    with open(delta_path, "wb") as out:
+        out.write(DELTA_MAGIC)
+        out.write(DELTA_HEADER.pack(base_sha, new_sha, n, block_size))
+        for op in ops:
+            if op[0] == "C":
+                out.write(b"C" + COPY_RECORD.pack(op[1], op[2]))
+            else:
+                out.write(b"D" + DATA_RECORD.pack(op[2] - op[1]))
+                out.write(data[op[1]:op[2]])
+        return out.tell()
+
+
+def read_delta_header(delta_path):
+    """-> (base_sha256 hex, new_sha256 hex, new_size)"""
+    with open(delta_path, "rb") as f:
+        if f.read(len(DELTA_MAGIC)) != DELTA_MAGIC:
+            raise ValueError(f"{delta_path}: not a delta file")
+        base_sha, new_sha, size, _block = DELTA_HEADER.unpack(f.read(DELTA_HEADER.size))
+    return base_sha.hex(), new_sha.hex(), size
+
+
+def _records(f):
+    while True:
+        kind = f.read(1)
+        if not kind:
+            return
+        if kind == b"C":
+            yield "C", COPY_RECORD.unpack(f.read(COPY_RECORD.size))
+        elif kind == b"D":
+            (length,) = DATA_RECORD.unpack(f.read(DATA_RECORD.size))
+            yield "D", f.read(length)
+        else:
+            raise ValueError(f"bad delta record {kind!r}")
+
+
+def apply_delta(old_path, delta_path, out_path, verify=True):
+    """Build out_path from old_path + delta. Returns True if the reflink path was used.
+
+    With a reflink the new file starts as a clone of the old one and only records that
+    differ at their offset are written, so the cost follows the size of the change.
+    """
+    base_sha, new_sha, size = read_delta_header(delta_path)
+    cloned = reflink(old_path, out_path)
+    with open(old_path, "rb") as old, open(delta_path, "rb") as delta, \
+            open(out_path, "r+b" if cloned else "wb") as out:
+        delta.seek(len(DELTA_MAGIC) + DELTA_HEADER.size)
+        pos = 0
+        for kind, value in _records(delta):
+            if kind == "C":
+                offset, length = value
+                if not (cloned and offset == pos):
+                    old.seek(offset)
+                    out.seek(pos)
+                    shutil.copyfileobj(_limited(old, length), out)
+                pos += length
+            else:
+                out.seek(pos)
+                out.write(value)
+                pos += len(value)
+        out.truncate(size)
+    if verify and sha256_file(out_path) != new_sha:
+        os.remove(out_path)
+        raise ValueError(f"{delta_path}: result does not match {new_sha}")
+    return cloned
+
+
+class _limited:
+    """File-like view reading at most `left` bytes, for shutil.copyfileobj."""
+
+    def __init__(self, f, left):
+        self.f = f
+        self.left = left
+
+    def read(self, size=-1):
+        if self.left <= 0:
+            return b""
+        size = self.left if size < 0 else min(size, self.left)
+        chunk = self.f.read(size)
+        self.left -= len(chunk)
+        return chunk
+
+
+# ---------------- Store ----------------
+class PackageStore:
+    def __init__(self, root):
+        self.root = root
+        self.objects = os.path.join(root, "objects")
+        self.tmp = os.path.join(root, "tmp")
+        os.makedirs(self.objects, exist_ok=True)
+        os.makedirs(self.tmp, exist_ok=True)
+
+    def path(self, sha):
+        return os.path.join(self.objects, sha[:2], sha)
+
+    def has(self, sha):
+        return bool(sha) and os.path.exists(self.path(sha))
+
+    def new_temp(self):
+        fd, path = tempfile.mkstemp(dir=self.tmp, suffix=".part")
+        os.close(fd)
+        return path
+
+    def commit_temp(self, tmp_path, sha):
+        """Move a fully written temp file into the store under its hash."""
+        target = self.path(sha)
+        if os.path.exists(target):
+            os.remove(tmp_path)
+            return target
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.chmod(tmp_path, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(tmp_path, target)
+        return target
+
+    def add(self, path):
+        sha = sha256_file(path)
+        if not self.has(sha):
+            tmp_path = self.new_temp()
+            if not reflink(path, tmp_path):
+                shutil.copyfile(path, tmp_path)
+            self.commit_temp(tmp_path, sha)
+        return sha
+
+    def add_delta(self, delta_path):
+        """Build a new object from a delta against an object already in the store."""
+        base_sha, new_sha, _size = read_delta_header(delta_path)
+        if self.has(new_sha):
+            return new_sha
+        if not self.has(base_sha):
+            raise KeyError(base_sha)
+        tmp_path = self.new_temp()
+        try:
+            apply_delta(self.path(base_sha), delta_path, tmp_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.commit_temp(tmp_path, new_sha)
+        return new_sha
+
+    def materialize(self, sha, target):
+        """Place a writable copy of object sha at target: reflink, then copy.
+
+        No hardlinks: the install would share the read-only object's inode, so apps
+        couldn't write next to themselves and any edit would corrupt the object.
+        """
+        source = self.path(sha)
+        if reflink(source, target):
+            return "reflink"
+        shutil.copyfile(source, target)
+        return "copy"
+
+    def gc(self, keep):
+        """Drop objects whose hash is not in keep (e.g. StateDB.hashes()). Returns bytes freed."""
+        freed = 0
+        for sub in os.listdir(self.objects):
+            folder = os.path.join(self.objects, sub)
+            for name in os.listdir(folder):
+                path = os.path.join(folder, name)
+                st = os.stat(path)
+                if name not in keep:
+                    os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+                    os.remove(path)
+                    freed += st.st_size
+        return freed
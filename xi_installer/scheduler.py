@@ -0,0 +1,179 @@
+"""
+scheduler.py
+
+Dependency-aware batch installs for XiInstaller.
+
+Apps declare what they need in the catalog ("depends": ["XiRuntime.xipkg"]). The
+requested apps and everything they depend on are resolved into a DAG; each app is
+installed once, as soon as all of its dependencies are in, with independent apps
+running concurrently. A shared semaphore caps concurrent file I/O across all installs.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from install_engine import InstallEngine, InstallError, InstallCancelled, InstallResult
+
+
+class DependencyError(InstallError):
+    pass
+
+
+def resolve(targets, depends_of):
+    """Return {app: set(deps)} for targets and all their transitive dependencies.
+
+    depends_of(app) -> iterable of app names, raises KeyError for unknown apps.
+    Raises DependencyError on unknown apps and cycles.
+    """
+    graph = {}
+    stack = list(targets)
+    while stack:
+        app = stack.pop()
+        if app in graph:
+            continue
+        try:
+            deps = set(depends_of(app))
+        except KeyError:
+            raise DependencyError(f"unknown app: {app}")
+        graph[app] = deps
+        stack.extend(deps - graph.keys())
+    topological_order(graph)  # raises on cycles
+    return graph
+
+
+def prune_installed(graph, installed, targets):
+    """Drop dependencies that are already installed (requested apps are always kept)."""
+    keep = {app for app in graph if app in targets or app not in installed}
+    return {app: deps & keep for app, deps in graph.items() if app in keep}
+
+
+def topological_order(graph):
+    """Kahn's algorithm; dependencies come before dependents."""
+    pending = {app: len(deps) for app, deps in graph.items()}
+    dependents = {app: [] for app in graph}
+    for app, deps in graph.items():
+        for dep in deps:
+            dependents[dep].append(app)
+    ready = sorted(app for app, n in pending.items() if n == 0)
+    order = []
+    while ready:
+        app = ready.pop()
+        order.append(app)
+        for child in dependents[app]:
+            pending[child] -= 1
+            if pending[child] == 0:
+                ready.append(child)
+    if len(order) != len(graph):
+        cycle = sorted(app for app, n in pending.items() if n)
+        raise DependencyError("dependency cycle between: " + ", ".join(cycle))
+    return order
+
+
+class Scheduler:
+    """Runs InstallJobs along a dependency graph.
+
+    max_parallel bounds how many apps install at once; io_limit bounds concurrent
+    file writes across all of them (package members included).
+    """
+
+    def __init__(self, max_parallel=4, io_limit=2, engine=None, on_start=None, on_done=None):
+        self.max_parallel = max(1, max_parallel)
+        self.io_slots = threading.BoundedSemaphore(max(1, io_limit))
+        self.engine = engine or InstallEngine()
+        self.engine.io_slots = self.io_slots
+        self.on_start = on_start
+        self.on_done = on_done
+        self.results = []
+
+    def cancel(self):
+        self.engine.cancel()
+
+    def run(self, jobs, graph):
+        """jobs: {app: InstallJob}, graph: {app: set(deps)} from resolve().
+
+        Returns a list of InstallResult in completion order (also kept in self.results).
+        Apps whose dependency failed are not attempted and get a DependencyError; after
+        cancel() the rest get InstallCancelled.
+
+        If run() is interrupted (KeyboardInterrupt), the installs in flight are cancelled
+        and waited for; the ones that completed are kept and the rest are rolled back
+        before the exception propagates.
+        """
+        self.engine.begin()
+        pending = {app: set(deps) for app, deps in graph.items()}
+        dependents = {app: [] for app in graph}
+        for app, deps in graph.items():
+            for dep in deps:
+                dependents[dep].append(app)
+        self.results = results = []
+        failed = set()
+
+        def report(result):
+            results.append(result)
+            if self.on_done:
+                self.on_done(result)
+
+        def skip(app, reason, error=DependencyError):
+            # fail app and, transitively, everything waiting on it
+            stack = [(app, reason)]
+            while stack:
+                name, why = stack.pop()
+                if name in failed or name not in pending:
+                    continue
+                failed.add(name)
+                del pending[name]
+                report(InstallResult(jobs[name], error=error(f"{name}: {why}")))
+                child_why = why if error is InstallCancelled else f"dependency {name} failed"
+                stack.extend((child, child_why) for child in dependents[name])
+
+        def collect(fut, app):
+            try:
+                result = InstallResult(jobs[app], sha256=fut.result())
+            except Exception as e:
+                result = InstallResult(jobs[app], error=e)
+            report(result)
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as pool:
+            running = {}
+            try:
+                while pending or running:
+                    for app in [a for a, deps in pending.items() if not deps]:
+                        if self.engine.cancelled:
+                            skip(app, "cancelled", InstallCancelled)
+                            continue
+                        del pending[app]
+                        if self.on_start:
+                            self.on_start(app)
+                        running[pool.submit(self.engine.install, jobs[app])] = app
+                    if not running:
+                        # everything left waits on something that failed or was cancelled
+                        for app in list(pending):
+                            if self.engine.cancelled:
+                                skip(app, "cancelled", InstallCancelled)
+                            else:
+                                skip(app, "dependency failed")
+                        break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        app = running.pop(fut)
+                        if collect(fut, app).ok:
+                            for child in dependents[app]:
+                                if child in pending:
+                                    pending[child].discard(app)
+                        else:
+                            failed.add(app)
+                            for child in dependents[app]:
+                                skip(child, f"dependency {app} failed")
+            except BaseException:
+                self.engine.cancel()
+                wait(running)
+                for fut, app in running.items():
+                    collect(fut, app)
+                for app in list(pending):
+                    skip(app, "cancelled", InstallCancelled)
+                self.engine.finish(results, keep_done=True)
+                raise
+
+        self.engine.finish(results)
+        return results
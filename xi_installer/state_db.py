@@ -0,0 +1,167 @@
+"""
+state_db.py
+
+Installed-apps state for XiInstaller, kept in SQLite (WAL mode) instead of installed.json.
+
+- One row per app: path, size, mtime, sha256
+- Multi-app changes are written in a single transaction
+- Several installer processes can use the database at once (WAL + busy timeout)
+- The old installed.json is imported once
+- verify() stats every install and only rehashes files whose size or mtime changed
+"""
+
+import os
+import json
+import time
+import sqlite3
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from install_engine import sha256_file
+
+DB_NAME = "state.db"
+LEGACY_JSON = "installed.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS apps (
+    name         TEXT PRIMARY KEY,
+    path         TEXT NOT NULL,
+    size         INTEGER,
+    mtime_ns     INTEGER,
+    sha256       TEXT,
+    installed_at REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# verify() statuses
+OK = "ok"
+MISSING = "missing"
+MODIFIED = "modified"
+UNKNOWN = "unknown"  # no hash on record and metadata changed
+
+
+def data_dir():
+    base = os.getenv("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "XiInstaller")
+
+
+class StateDB:
+    def __init__(self, path=None, timeout=30.0):
+        self.path = path or os.path.join(data_dir(), DB_NAME)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(self.path, timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Take the write lock up front so concurrent installers queue instead of deadlocking."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    # ---------------- Queries ----------------
+    def all(self):
+        rows = self.conn.execute("SELECT name, path, size, mtime_ns, sha256, installed_at FROM apps ORDER BY name")
+        return {r[0]: {"path": r[1], "size": r[2], "mtime_ns": r[3], "sha256": r[4], "installed_at": r[5]}
+                for r in rows}
+
+    def paths(self):
+        return dict(self.conn.execute("SELECT name, path FROM apps ORDER BY name"))
+
+    def hashes(self):
+        """sha256 of every recorded install, e.g. what a PackageStore must keep."""
+        return {r[0] for r in self.conn.execute("SELECT sha256 FROM apps WHERE sha256 IS NOT NULL")}
+
+    # ---------------- Updates ----------------
+    def record_installs(self, installs):
+        """installs: iterable of (app_name, path, sha256). Size/mtime are taken from disk."""
+        now = time.time()
+        rows = []
+        for name, path, sha in installs:
+            st = os.stat(path)
+            rows.append((name, path, st.st_size, st.st_mtime_ns, sha, now))
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO apps (name, path, size, mtime_ns, sha256, installed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def remove(self, names):
+        with self.transaction() as conn:
+            conn.executemany("DELETE FROM apps WHERE name = ?", [(n,) for n in names])
+
+    def migrate_json(self, json_path):
+        """Import a legacy installed.json once. Returns the number of apps imported."""
+        json_path = os.path.abspath(json_path)
+        if not os.path.exists(json_path):
+            return 0
+        with self.transaction() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = ?", ("migrated:" + json_path,)).fetchone():
+                return 0
+            with open(json_path, "r") as f:
+                legacy = json.load(f)
+            count = 0
+            for name, path in legacy.items():
+                if conn.execute("SELECT 1 FROM apps WHERE name = ?", (name,)).fetchone():
+                    continue
+                size = mtime = sha = None
+                if os.path.exists(path):
+                    st = os.stat(path)
+                    size, mtime, sha = st.st_size, st.st_mtime_ns, sha256_file(path)
+                conn.execute("INSERT INTO apps (name, path, size, mtime_ns, sha256, installed_at) "
+                             "VALUES (?, ?, ?, ?, ?, NULL)", (name, path, size, mtime, sha))
+                count += 1
+            conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)", ("migrated:" + json_path, str(time.time())))
+        return count
+
+    # ---------------- Verify ----------------
+    def verify(self, max_workers=4):
+        """Check every install. Returns {app_name: status}.
+
+        Files whose size and mtime match the record are trusted without reading them;
+        the rest are rehashed in parallel and, if the content is unchanged, their new
+        metadata is stored so the next check is stat-only again.
+        """
+        records = self.all()
+        status = {}
+        rehash = []
+        for name, rec in records.items():
+            try:
+                st = os.stat(rec["path"])
+            except OSError:
+                status[name] = MISSING
+                continue
+            if st.st_size == rec["size"] and st.st_mtime_ns == rec["mtime_ns"]:
+                status[name] = OK
+            elif rec["sha256"] is None:
+                status[name] = UNKNOWN
+            else:
+                rehash.append((name, rec, st))
+
+        def check(item):
+            name, rec, st = item
+            return name, st, sha256_file(rec["path"]) == rec["sha256"]
+
+        refreshed = []
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for name, st, same in pool.map(check, rehash):
+                status[name] = OK if same else MODIFIED
+                if same:
+                    refreshed.append((st.st_size, st.st_mtime_ns, name))
+        if refreshed:
+            with self.transaction() as conn:
+                conn.executemany("UPDATE apps SET size = ?, mtime_ns = ? WHERE name = ?", refreshed)
+        return status
@@ -0,0 +1,166 @@
+"""
+xipkg.py
+
+Xi package format (.xipkg): a zip container with every member compressed on its own
+(xz/LZMA) plus an "xipkg.json" manifest:
+
+    {"name": "XiExplorer", "version": "1.2", "entry": "XiExplorer.exe", "depends": ["XiRuntime.xipkg"],
+     "files": {"XiExplorer.exe": {"size": 123, "sha256": "..."}, "data/x.bin": {...}}}
+
+Because members are compressed independently they can be decompressed in parallel,
+each one streamed straight to disk and hashed while it is written.
+
+Build a package:
+python xipkg.py build path/to/app_folder -o programs/XiExplorer.xipkg --entry XiExplorer.exe
+"""
+
+import os
+import sys
+import json
+import hashlib
+import zipfile
+import argparse
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+
+PACKAGE_EXT = ".xipkg"
+MANIFEST_MEMBER = "xipkg.json"
+CHUNK_SIZE = 1024 * 1024
+
+
+class PackageError(Exception):
+    pass
+
+
+def read_manifest(package_path):
+    with zipfile.ZipFile(package_path) as zf:
+        try:
+            return json.loads(zf.read(MANIFEST_MEMBER).decode("utf-8"))
+        except KeyError:
+            raise PackageError(f"{package_path}: no {MANIFEST_MEMBER}")
+
+
+def build_package(src_dir, out_path, entry, name=None, version=None, depends=()):
+    files = {}
+    members = []
+    for folder, _dirs, names in os.walk(src_dir):
+        for file_name in sorted(names):
+            path = os.path.join(folder, file_name)
+            arcname = os.path.relpath(path, src_dir).replace(os.sep, "/")
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    h.update(chunk)
+            files[arcname] = {"size": os.path.getsize(path), "sha256": h.hexdigest()}
+            members.append((path, arcname))
+    if entry not in files:
+        raise PackageError(f"entry {entry} is not in {src_dir}")
+    manifest = {
+        "name": name or os.path.splitext(entry)[0],
+        "version": version,
+        "entry": entry,
+        "depends": list(depends),
+        "files": files,
+    }
+    tmp_path = out_path + ".tmp"
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_LZMA) as zf:
+        zf.writestr(MANIFEST_MEMBER, json.dumps(manifest, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+        for path, arcname in members:
+            zf.write(path, arcname)
+    os.replace(tmp_path, out_path)
+    return manifest
+
+
+def _safe_join(root, arcname):
+    path = os.path.normpath(os.path.join(root, arcname))
+    if os.path.commonpath([os.path.abspath(root), os.path.abspath(path)]) != os.path.abspath(root):
+        raise PackageError(f"member escapes the install folder: {arcname}")
+    return path
+
+
+def extract_package(package_path, dest_dir, max_workers=4, chunk_size=CHUNK_SIZE,
+                    on_progress=None, cancel_event=None, io_slots=None):
+    """Stream every member into dest_dir in parallel, checking sizes and hashes.
+
+    on_progress(done_bytes, total_bytes) may be called from several threads.
+    io_slots, if given, is held while each member is written (shared I/O limit).
+    Returns the manifest. dest_dir is left half-filled on error; the caller owns cleanup.
+    """
+    manifest = read_manifest(package_path)
+    files = manifest["files"]
+    total = sum(info["size"] for info in files.values())
+    done = [0]
+    lock = threading.Lock()
+    local = threading.local()
+    handles = []
+
+    def zip_handle():
+        # one ZipFile per thread so reads and seeks don't interleave
+        if not hasattr(local, "zf"):
+            local.zf = zipfile.ZipFile(package_path)
+            with lock:
+                handles.append(local.zf)
+        return local.zf
+
+    def extract(arcname):
+        info = files[arcname]
+        target = _safe_join(dest_dir, arcname)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        h = hashlib.sha256()
+        size = 0
+        with io_slots or nullcontext(), zip_handle().open(arcname) as src, open(target, "wb") as dst:
+            for chunk in iter(lambda: src.read(chunk_size), b""):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise PackageError(f"{arcname}: cancelled")
+                dst.write(chunk)
+                h.update(chunk)
+                size += len(chunk)
+                if on_progress:
+                    with lock:
+                        done[0] += len(chunk)
+                        progress = done[0]
+                    on_progress(progress, total)
+        if size != info["size"] or h.hexdigest() != info["sha256"]:
+            raise PackageError(f"{arcname}: checksum mismatch")
+
+    # biggest members first so one large file doesn't start last
+    order = sorted(files, key=lambda a: files[a]["size"], reverse=True)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            for _ in pool.map(extract, order):
+                pass
+    finally:
+        for zf in handles:
+            zf.close()
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="xipkg.py")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="pack an app folder into a .xipkg")
+    build.add_argument("folder")
+    build.add_argument("-o", "--output", required=True)
+    build.add_argument("--entry", required=True, help="executable to launch, relative to the folder")
+    build.add_argument("--name")
+    build.add_argument("--version")
+    build.add_argument("--depends", nargs="*", default=[], help="catalog names this app needs installed first")
+    extract = sub.add_parser("extract", help="unpack a .xipkg (for testing)")
+    extract.add_argument("package")
+    extract.add_argument("dest")
+    extract.add_argument("-j", "--jobs", type=int, default=4)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        manifest = build_package(args.folder, args.output, args.entry, args.name, args.version, args.depends)
+        raw = sum(info["size"] for info in manifest["files"].values())
+        print(f"{args.output}: {len(manifest['files'])} files, {raw} -> {os.path.getsize(args.output)} bytes")
+    else:
+        os.makedirs(args.dest, exist_ok=True)
+        extract_package(args.package, args.dest, args.jobs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
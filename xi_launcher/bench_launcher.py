@@ -0,0 +1,168 @@
+"""
+bench_launcher.py
+
+Startup cost of the Xi tools: cold per-app starts vs opens through a warm launcher.
+
+- import profile: `python -X importtime` for each tool's module and for the launcher's
+  forwarding client, summed per top-level import
+- cold: a new process per tool, doing what the tool's own __main__ does, timed from
+  launch until its window has been shown
+- warm: `xi_launcher.py <tool>` with a launcher already running (--keep-warm), timed
+  from launch of the client until the launcher reports the window shown; "first" is
+  the first open of a tool (its module still gets imported), "again" is a second open
+
+The launcher under test registers in a temporary data folder, so it does not touch a
+launcher you have running. Needs a display, or QT_QPA_PLATFORM=offscreen for Qt tools.
+
+Run:
+python bench_launcher.py --runs 3 --tools explorer flowchart
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from tools import TOOLS
+from xi_launcher import forward
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LAUNCHER = os.path.join(HERE, "xi_launcher.py")
+
+
+# ---------------- Children ----------------
+def child_import(key):
+    # what importing the tool costs, without creating any window
+    import importlib.util
+    tool = TOOLS[key]
+    sys.path.insert(0, os.path.dirname(tool.path))
+    spec = importlib.util.spec_from_file_location(f"xi_tool_{key}", tool.path)
+    spec.loader.exec_module(importlib.util.module_from_spec(spec))
+    return 0
+
+
+def child_cold(key):
+    import importlib.util
+    tool = TOOLS[key]
+    start = time.perf_counter()
+    sys.path.insert(0, os.path.dirname(tool.path))
+    spec = importlib.util.spec_from_file_location(f"xi_tool_{key}", tool.path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if tool.toolkit == "tk":
+        import tkinter as tk
+        root = tk.Tk()
+        getattr(module, tool.window)(root)
+        root.update()
+        print("shown", flush=True)
+        root.destroy()
+        return 0
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QTimer
+    app = QApplication(sys.argv[:1])
+    window = getattr(module, tool.window)()
+    window.show()
+    QTimer.singleShot(0, lambda: (print("shown", flush=True), app.quit()))
+    app.exec()
+    return 0
+
+
+# ---------------- Measurements ----------------
+def import_profile(args, env, top=6):
+    """[(cumulative us, name)] for top-level imports, slowest first, and their total."""
+    proc = subprocess.run([sys.executable, "-X", "importtime"] + args, env=env, capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # top-level only (nested imports are indented)
+            rows.append((int(cumulative), name.strip()))
+    rows.sort(reverse=True)
+    return sum(us for us, _ in rows), rows[:top], proc.returncode
+
+
+def timed(cmd, env, until):
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    out, err = proc.communicate()
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0 or (until and until not in out):
+        raise RuntimeError(f"{' '.join(cmd)} failed:\n{err.strip()}")
+    return elapsed
+
+
+def start_launcher(env):
+    proc = subprocess.Popen([sys.executable, LAUNCHER, "--keep-warm"], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    deadline = time.perf_counter() + 30
+    while not os.path.exists(os.path.join(env["LOCALAPPDATA"], "XiLauncher", "instance.json")):
+        if proc.poll() is not None or time.perf_counter() > deadline:
+            raise RuntimeError("launcher did not start:\n" + proc.stderr.read())
+        time.sleep(0.05)
+    return proc
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--tools", nargs="*", default=list(TOOLS))
+    parser.add_argument("--child-import", help=argparse.SUPPRESS)
+    parser.add_argument("--child-cold", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child_import:
+        return child_import(args.child_import)
+    if args.child_cold:
+        return child_cold(args.child_cold)
+
+    data = tempfile.mkdtemp()
+    os.environ["LOCALAPPDATA"] = data  # for forward() below and every child
+    env = dict(os.environ)
+    me = os.path.abspath(__file__)
+
+    print("import profile (-X importtime, top-level imports)")
+    total, rows, _ = import_profile([LAUNCHER, "--quit"], env)
+    print(f"  launcher client     {total / 1000:8.1f} ms  " + ", ".join(f"{n} {us / 1000:.1f}" for us, n in rows[:4]))
+    for key in args.tools:
+        total, rows, code = import_profile([me, "--child-import", key], env)
+        if code:
+            print(f"  {key:<18}  import failed (missing dependency?)")
+            continue
+        print(f"  {key:<18} {total / 1000:8.1f} ms  " + ", ".join(f"{n} {us / 1000:.1f}" for us, n in rows[:4]))
+
+    print(f"\ntime to first window, median of {args.runs} (ms)")
+    print(f"{'tool':<12} {'cold':>8} {'warm first':>11} {'warm again':>11} {'in launcher':>12}")
+    cold = {}
+    for key in args.tools:
+        try:
+            cold[key] = statistics.median(timed([sys.executable, me, "--child-cold", key], env, "shown")
+                                          for _ in range(args.runs))
+        except RuntimeError as e:
+            print(f"{key:<12} skipped: {str(e).splitlines()[-1]}")
+    if not cold:
+        shutil.rmtree(data, ignore_errors=True)
+        return 1
+    launcher = start_launcher(env)
+    try:
+        for key in cold:
+            first = timed([sys.executable, LAUNCHER, key], env, None)
+            again = statistics.median(timed([sys.executable, LAUNCHER, key], env, None) for _ in range(args.runs))
+            # the launcher's own view of an open, without the client process startup
+            reply = forward({"open": [key]})
+            print(f"{key:<12} {cold[key] * 1000:>8.0f} {first * 1000:>11.0f} {again * 1000:>11.0f} "
+                  f"{reply['ms'] if reply else float('nan'):>12.1f}")
+    finally:
+        subprocess.run([sys.executable, LAUNCHER, "--quit"], env=env)
+        launcher.wait(10)
+        shutil.rmtree(data, ignore_errors=True)
+    if "installer" in cold:
+        print("(installer is single-window: warm opens after the first just raise it)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
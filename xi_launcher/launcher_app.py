@@ -0,0 +1,229 @@
+"""
+launcher_app.py
+
+The launcher process: one QApplication, the shared dark theme, tools imported on first
+open, and the localhost server that later launches forward their requests to.
+"""
+
+import os
+import sys
+import json
+import time
+import secrets
+import importlib.util
+
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QMessageBox
+from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtNetwork import QTcpServer, QHostAddress
+
+from tools import TOOLS, data_dir, instance_file
+
+TK_PUMP_MS = 10
+
+_modules = {}
+
+
+def apply_dark_theme(app):
+    """The file explorer's dark theme. Importing it here also warms the explorer module."""
+    load_module(TOOLS["explorer"]).apply_dark_theme(app)
+
+
+def load_module(tool):
+    """Import a tool's script under a unique name, with its folder on sys.path for its
+    own helper modules. Cached, so each tool is imported once per process."""
+    if tool.key not in _modules:
+        folder = os.path.dirname(tool.path)
+        if folder not in sys.path:
+            sys.path.insert(0, folder)
+        spec = importlib.util.spec_from_file_location(f"xi_tool_{tool.key}", tool.path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[spec.name]
+            raise
+        _modules[tool.key] = module
+    return _modules[tool.key]
+
+
+class Launcher:
+    def __init__(self, app, keep_warm=False):
+        self.app = app
+        self.keep_warm = keep_warm
+        self.windows = {key: [] for key in TOOLS}
+        self.hub = None
+        self.tk_root = None
+        self.tk_timer = None
+        self.token = secrets.token_hex(16)
+        self.buffers = {}
+
+        self.server = QTcpServer()
+        self.server.newConnection.connect(self.on_connection)
+        if not self.server.listen(QHostAddress.SpecialAddress.LocalHost, 0):
+            raise OSError(self.server.errorString())
+        os.makedirs(data_dir(), exist_ok=True)
+        tmp = instance_file() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"port": self.server.serverPort(), "token": self.token, "pid": os.getpid()}, f)
+        os.replace(tmp, instance_file())
+
+    def shutdown(self):
+        try:
+            with open(instance_file(), "r", encoding="utf-8") as f:
+                if json.load(f).get("token") == self.token:
+                    os.remove(instance_file())
+        except (OSError, ValueError):
+            pass
+        self.server.close()
+
+    # ---------------- Requests ----------------
+    def on_connection(self):
+        while self.server.hasPendingConnections():
+            sock = self.server.nextPendingConnection()
+            self.buffers[sock] = b""
+            sock.readyRead.connect(lambda sock=sock: self.on_ready_read(sock))
+            sock.disconnected.connect(lambda sock=sock: self.buffers.pop(sock, None))
+
+    def on_ready_read(self, sock):
+        data = self.buffers.get(sock, b"") + bytes(sock.readAll())
+        self.buffers[sock] = data
+        if not data.endswith(b"\n"):
+            return
+        try:
+            request = json.loads(data)
+        except ValueError:
+            request = {}
+        if request.get("token") != self.token:
+            sock.disconnectFromHost()
+            return
+        start = time.perf_counter()
+        reply = self.handle(request)
+
+        def send():
+            # after the event loop has run once, so new windows are actually shown
+            reply["ms"] = round((time.perf_counter() - start) * 1000, 1)
+            sock.write((json.dumps(reply) + "\n").encode("utf-8"))
+            sock.disconnectFromHost()
+        QTimer.singleShot(0, send)
+
+    def handle(self, request):
+        if request.get("quit"):
+            QTimer.singleShot(0, self.app.quit)
+            return {"ok": True}
+        errors = {}
+        for key in request.get("open", []):
+            try:
+                self.open(key)
+            except Exception as e:
+                errors[key] = f"{type(e).__name__}: {e}"
+        if request.get("hub"):
+            self.show_hub()
+        return {"ok": not errors, "errors": errors}
+
+    # ---------------- Windows ----------------
+    def open(self, key):
+        tool = TOOLS[key]
+        if tool.single and self.windows[key]:
+            self.raise_window(self.windows[key][0], tool)
+            return
+        module = load_module(tool)
+        if tool.toolkit == "tk":
+            self.open_tk(tool, module)
+            return
+        window = getattr(module, tool.window)()
+        window.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        window.destroyed.connect(lambda *_, key=key, window=window: self.closed(key, window))
+        self.windows[key].append(window)
+        window.show()
+        self.raise_window(window, tool)
+
+    def raise_window(self, window, tool):
+        if tool.toolkit == "tk":
+            window.deiconify()
+            window.lift()
+            window.focus_force()
+        else:
+            window.showNormal()
+            window.raise_()
+            window.activateWindow()
+
+    def open_tk(self, tool, module):
+        import tkinter as tk  # only once Auto Clicker is opened
+        if self.tk_root is None:
+            self.tk_root = tk.Tk()
+            self.tk_root.withdraw()
+            self.tk_timer = QTimer()
+            self.tk_timer.timeout.connect(self.pump_tk)
+            self.tk_timer.start(TK_PUMP_MS)
+        top = tk.Toplevel(self.tk_root)
+        app = getattr(module, tool.window)(top)
+        top.bind("<Destroy>", lambda event: event.widget is top and self.tk_closed(tool.key, top, app))
+        self.windows[tool.key].append(top)
+        self.pump_tk()
+
+    def pump_tk(self):
+        # Tk never enters mainloop() here, so Tk calls from other threads would fail; tools
+        # hand such work to the GUI thread themselves (see AutoClicker.post)
+        try:
+            self.tk_root.update()
+        except Exception:  # tkinter.TclError, e.g. while a window is being torn down
+            pass
+
+    def tk_closed(self, key, top, app):
+        # the tool's threads (click scheduler, macro player, hotkey listener) outlive its window
+        if hasattr(app, "close"):
+            app.close()
+        self.closed(key, top)
+        QTimer.singleShot(0, self.stop_tk)  # not from inside the update() that destroys it
+
+    def stop_tk(self):
+        if self.tk_root is None or any(self.windows[key] for key, tool in TOOLS.items() if tool.toolkit == "tk"):
+            return
+        self.tk_timer.stop()
+        self.tk_timer = None
+        try:
+            self.tk_root.destroy()
+        except Exception:
+            pass
+        self.tk_root = None
+
+    def closed(self, key, window):
+        if window in self.windows[key]:
+            self.windows[key].remove(window)
+        QTimer.singleShot(0, self.maybe_quit)
+
+    def maybe_quit(self):
+        if self.keep_warm or self.hub is not None or any(self.windows.values()):
+            return
+        self.app.quit()
+
+    def show_hub(self):
+        if self.hub is None:
+            self.hub = QWidget()
+            self.hub.setWindowTitle("Xi Launcher")
+            self.hub.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+            layout = QVBoxLayout(self.hub)
+            title = QLabel("Xi Tools")
+            title.setFont(QFont("Arial", 16, QFont.Weight.Bold))
+            layout.addWidget(title)
+            for tool in TOOLS.values():
+                button = QPushButton(tool.title)
+                button.setMinimumHeight(36)
+                button.clicked.connect(lambda _, key=tool.key: self.open_from_hub(key))
+                layout.addWidget(button)
+            self.hub.destroyed.connect(self.hub_closed)
+        self.hub.show()
+        self.hub.raise_()
+        self.hub.activateWindow()
+
+    def open_from_hub(self, key):
+        try:
+            self.open(key)
+        except Exception as e:
+            QMessageBox.warning(self.hub, "Xi Launcher", f"Could not open {TOOLS[key].title}:\n{e}")
+
+    def hub_closed(self, *_):
+        self.hub = None
+        QTimer.singleShot(0, self.maybe_quit)
@@ -0,0 +1,42 @@
+"""
+tools.py
+
+The Xi tools the launcher knows about, and where the running launcher registers itself.
+Standard library only: the forwarding client imports this without Qt.
+"""
+
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Tool:
+    def __init__(self, key, title, folder, script, window, single=False, toolkit="qt"):
+        self.key = key
+        self.title = title
+        self.folder = folder
+        self.script = script
+        self.window = window      # class to instantiate from the module
+        self.single = single      # raise the open window instead of opening another
+        self.toolkit = toolkit
+
+    @property
+    def path(self):
+        return os.path.join(ROOT, self.folder, self.script)
+
+
+TOOLS = {tool.key: tool for tool in (
+    Tool("explorer", "Xi File Explorer", "xi_file_explorer", "main.py", "FileExplorer"),
+    Tool("flowchart", "Xi Flowchart", "xi_flowchart", "xi_flowchart.py", "MainWindow"),
+    Tool("installer", "Xi Installer", "xi_installer", "main.py", "XiInstaller", single=True),
+    Tool("clicker", "Auto Clicker", "auto_clicker", "AutoClickerMain.py", "AutoClicker", toolkit="tk"),
+)}
+
+
+def data_dir():
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "XiLauncher")
+
+
+def instance_file():
+    return os.path.join(data_dir(), "instance.json")
@@ -0,0 +1,102 @@
+"""
+xi_launcher.py
+
+One warm process for the Xi tools.
+
+The launcher creates the QApplication and the shared dark theme once. A tool's module
+is imported the first time it is opened, so opening a second window, or another tool,
+only pays for building the window. Auto Clicker is a tkinter app; its windows run as
+Tk Toplevels in the same process, pumped from a Qt timer.
+
+Only one launcher runs per user. It listens on a localhost port recorded in
+instance.json under the user data folder, with a random token. A later
+`xi_launcher.py <tool>` sends its request there and exits. That path only uses the
+standard library, so it does not import Qt at all.
+
+Run:
+python xi_launcher.py                  # hub window with a button per tool
+python xi_launcher.py explorer         # open tools (in the running launcher if any)
+python xi_launcher.py --keep-warm      # start in the background, stay running with no windows
+python xi_launcher.py --quit
+"""
+
+import sys
+import json
+import socket
+import argparse
+
+from tools import TOOLS, instance_file
+
+CONNECT_TIMEOUT = 0.5
+# opening a cold tool can take a while, but a port taken over by some other
+# program (stale instance.json) must not hang us: give up and start cold
+REPLY_TIMEOUT = 30
+
+
+def forward(request):
+    """Send request to the running launcher. Returns its reply, or None if there is none."""
+    try:
+        with open(instance_file(), "r", encoding="utf-8") as f:
+            info = json.load(f)
+        sock = socket.create_connection(("127.0.0.1", info["port"]), timeout=CONNECT_TIMEOUT)
+    except (OSError, ValueError, KeyError):
+        return None
+    data = b""
+    try:
+        with sock:
+            sock.settimeout(REPLY_TIMEOUT)
+            sock.sendall((json.dumps(dict(request, token=info["token"])) + "\n").encode("utf-8"))
+            while not data.endswith(b"\n"):
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+    except OSError:  # includes socket.timeout
+        return None
+    try:
+        return json.loads(data)
+    except ValueError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Open Xi tools in one warm process.")
+    parser.add_argument("tools", nargs="*", metavar="tool",
+                        help=f"tools to open: {', '.join(TOOLS)} (default: the hub window)")
+    parser.add_argument("--keep-warm", action="store_true", help="keep running after the last window closes")
+    parser.add_argument("--quit", action="store_true", help="stop the running launcher")
+    args = parser.parse_args(argv)
+    unknown = [key for key in args.tools if key not in TOOLS]
+    if unknown:
+        parser.error(f"unknown tool: {', '.join(unknown)} (have {', '.join(TOOLS)})")
+
+    request = {"quit": True} if args.quit else {"open": args.tools, "hub": not args.tools and not args.keep_warm}
+    reply = forward(request)
+    if reply is not None:
+        for key, error in reply.get("errors", {}).items():
+            print(f"{key}: {error}", file=sys.stderr)
+        return 0 if reply.get("ok") else 1
+    if args.quit:
+        return 0
+
+    # nobody is running: become the launcher
+    from PyQt6.QtWidgets import QApplication
+    from launcher_app import Launcher, apply_dark_theme
+    app = QApplication(sys.argv[:1])
+    app.setQuitOnLastWindowClosed(False)
+    apply_dark_theme(app)
+    launcher = Launcher(app, keep_warm=args.keep_warm)
+    reply = launcher.handle(request)
+    for key, error in reply.get("errors", {}).items():
+        print(f"{key}: {error}", file=sys.stderr)
+    if not reply.get("ok") and not args.keep_warm and not any(launcher.windows.values()):
+        launcher.shutdown()
+        return 1
+    try:
+        return app.exec()
+    finally:
+        launcher.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())